@@ -0,0 +1,59 @@
+"""
+Compares the section-aware chunker with the original 500-char slicer.
+
+    python -m benchmarks.bench_chunker --jd job.txt resume1.pdf resume2.txt ...
+
+For each resume it reports chunk count, embedding time (uncached) and the match
+score. Score stability is the std-dev of the score when the first 0..250
+characters are dropped: fixed slicing shifts every window, boundary-aware
+chunking should barely move.
+"""
+import argparse
+import time
+
+import numpy as np
+from langchain_huggingface import HuggingFaceEmbeddings
+
+from src.chunker import iter_chunks, iter_fixed_chunks
+from src.llm_engine import EMBEDDING_MODEL, _normalize_rows, _top_k_mean
+from src.pdf_handler import extract_text_from_pdf
+
+CHUNKERS = {"fixed": iter_fixed_chunks, "section": iter_chunks}
+OFFSETS = range(0, 300, 50)
+
+
+def _load(path):
+    if path.lower().endswith(".pdf"):
+        return extract_text_from_pdf(path)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _score(embeddings, chunks, jd_vector, k=5):
+    matrix = _normalize_rows(np.asarray(embeddings.embed_documents(chunks), dtype=np.float32))
+    return _top_k_mean(matrix @ jd_vector, k) * 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resumes", nargs="+")
+    parser.add_argument("--jd", required=True)
+    args = parser.parse_args()
+
+    embeddings = HuggingFaceEmbeddings(model_name=EMBEDDING_MODEL)
+    jd_vector = _normalize_rows(np.asarray([embeddings.embed_query(_load(args.jd))], dtype=np.float32))[0]
+
+    print(f"{'resume':<30} {'chunker':<8} {'chunks':>6} {'embed ms':>9} {'score':>6} {'stability σ':>12}")
+    for path in args.resumes:
+        text = _load(path)
+        for name, chunker in CHUNKERS.items():
+            chunks = list(chunker(text))
+            started = time.perf_counter()
+            score = _score(embeddings, chunks, jd_vector)
+            embed_ms = (time.perf_counter() - started) * 1000
+            shifted = [_score(embeddings, list(chunker(text[offset:])), jd_vector) for offset in OFFSETS]
+            print(f"{path[-30:]:<30} {name:<8} {len(chunks):>6} {embed_ms:>9.1f} {score:>6.1f} {np.std(shifted):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Compares embedding backends on throughput and on drift from the default backend.
+
+    CAREERFORGE_ONNX_MODEL_DIR=models/minilm-int8 \
+        python -m benchmarks.bench_embeddings --jd job.txt resume1.pdf resume2.txt ...
+
+Every resume is chunked as in the app and embedded uncached by each backend. It
+reports docs/sec, the mean/min cosine between each backend's chunk vectors and the
+reference backend's, and the largest match-score difference over the resumes.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from src.chunker import iter_chunks
+from src.embedding_backends import BACKENDS, load_backend
+from src.embedding_config import DEFAULT_BACKEND, EMBEDDING_MODEL
+from src.llm_engine import _normalize_rows, _top_k_mean
+from src.pdf_handler import extract_text_from_pdf
+
+
+def _load(path):
+    if path.lower().endswith(".pdf"):
+        return extract_text_from_pdf(path)
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+def _run(backend, resumes, job_desc):
+    """(docs/sec, stacked chunk vectors, per-resume scores)."""
+    chunks = [chunk for chunk_list in resumes for chunk in chunk_list]
+    backend.embed_documents(chunks[:8])  # warm-up: lazy init, thread pools
+    started = time.perf_counter()
+    matrix = _normalize_rows(np.asarray(backend.embed_documents(chunks), dtype=np.float32))
+    docs_per_sec = len(chunks) / (time.perf_counter() - started)
+    jd = _normalize_rows(np.asarray([backend.embed_query(job_desc)], dtype=np.float32))[0]
+    scores, start = [], 0
+    for chunk_list in resumes:
+        end = start + len(chunk_list)
+        scores.append(_top_k_mean(matrix[start:end] @ jd, 5) * 100)
+        start = end
+    return docs_per_sec, matrix, np.array(scores)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("resumes", nargs="+")
+    parser.add_argument("--jd", required=True)
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS), choices=list(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=1, help="Repeat the corpus to get a steadier docs/sec")
+    args = parser.parse_args()
+
+    resumes = [list(iter_chunks(_load(path))) for path in args.resumes] * args.repeat
+    job_desc = _load(args.jd)
+    backends = [DEFAULT_BACKEND] + [b for b in args.backends if b != DEFAULT_BACKEND]
+    print(f"{sum(map(len, resumes))} chunks from {len(resumes)} resumes, reference: {DEFAULT_BACKEND}\n")
+
+    print(f"{'backend':<22} {'docs/sec':>9} {'speedup':>8} {'mean cos':>9} {'min cos':>8} {'max Δscore':>11}")
+    reference = None
+    for name in backends:
+        docs_per_sec, matrix, scores = _run(load_backend(name, EMBEDDING_MODEL), resumes, job_desc)
+        if reference is None:
+            reference = (docs_per_sec, matrix, scores)
+        cosines = np.sum(matrix * reference[1], axis=1)
+        print(f"{name:<22} {docs_per_sec:>9.1f} {docs_per_sec / reference[0]:>7.2f}x "
+              f"{cosines.mean():>9.4f} {cosines.min():>8.4f} {np.abs(scores - reference[2]).max():>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
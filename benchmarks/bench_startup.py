@@ -0,0 +1,81 @@
+"""
+Cold-start cost of the Streamlit app: per-package import time and first render.
+
+    python -m benchmarks.bench_startup [--app index.py] [--limit 3.0] [--top 15]
+
+Runs the app once in a fresh interpreter under `-X importtime` via Streamlit's
+AppTest, then reports the slowest top-level imports, which heavy dependencies were
+loaded before the first render, and the render time. Exits non-zero when the first
+render takes longer than --limit seconds.
+"""
+import argparse
+import json
+import re
+import subprocess
+import sys
+from collections import defaultdict
+
+# Only needed once a feature is used; none of these should load on the landing page.
+HEAVY = (
+    "langchain_core", "langchain_groq", "langchain_community", "langchain_huggingface", "sentence_transformers",
+    "torch", "faiss", "reportlab", "pdfplumber", "duckduckgo_search", "streamlit_agraph",
+)
+
+_RENDER = """
+import json, sys, time
+started = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+app = AppTest.from_file(sys.argv[1], default_timeout=120)
+app.run()
+done = time.perf_counter()
+print(json.dumps({"streamlit_import": imported - started, "first_render": done - imported,
+                  "exceptions": [str(e.value) for e in app.exception]}))
+"""
+_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def _parse_importtime(stderr):
+    """{module: cumulative µs} for every import, plus cumulative µs per top-level package."""
+    modules, packages = {}, defaultdict(int)
+    for match in _LINE.finditer(stderr):
+        _, cumulative, indent, name = match.groups()
+        modules[name] = int(cumulative)
+        if len(indent) == 1:  # imported directly by the app, not by another module
+            packages[name.split(".")[0]] += int(cumulative)
+    return modules, packages
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--app", default="index.py")
+    parser.add_argument("--limit", type=float, default=3.0, help="Max seconds for the first render")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", _RENDER, args.app],
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        print(proc.stderr[-2000:], file=sys.stderr)
+        raise SystemExit(proc.returncode)
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    modules, packages = _parse_importtime(proc.stderr)
+
+    print(f"{'package':<32} {'import ms':>10}")
+    for name, micros in sorted(packages.items(), key=lambda kv: -kv[1])[:args.top]:
+        print(f"{name:<32} {micros / 1000:>10.1f}")
+
+    print(f"\n{'heavy dependency':<32} {'at startup':>10}")
+    for name in HEAVY:
+        print(f"{name:<32} {f'{modules[name] / 1000:.1f} ms' if name in modules else 'deferred':>10}")
+
+    render = result["first_render"]
+    print(f"\nstreamlit import {result['streamlit_import']:.2f}s, first render {render:.2f}s (limit {args.limit:.2f}s)")
+    for error in result["exceptions"]:
+        print(f"app raised: {error}", file=sys.stderr)
+    if render > args.limit or result["exceptions"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
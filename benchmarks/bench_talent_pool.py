@@ -0,0 +1,112 @@
+"""
+Measures TalentPool query latency and recall against exact search, per nprobe.
+
+    python -m benchmarks.bench_talent_pool --resumes 20000 --nprobe 4 8 16 32 64
+
+The corpus is synthetic so it scales without an embedding model: resumes are noisy
+copies of random "role" centroids, each split into several chunk vectors. It is loaded
+through add_resumes in batches (exercising IVF training and retraining), then each
+query is timed through search() and compared with an exact max-over-chunks ranking.
+Recall@N is the share of the exact top N that the pool returns. The sub-100ms goal
+is checked against p95 latency.
+"""
+import argparse
+import tempfile
+import time
+
+import numpy as np
+
+from src.talent_pool import TalentPool
+
+TARGET_MS = 100
+
+
+class _SyntheticEmbeddings:
+    """Looks up precomputed vectors: chunk "i" is row i of `chunks`, query "q{j}" row j of `queries`."""
+
+    def __init__(self, chunks, queries):
+        self.chunks = chunks
+        self.queries = queries
+
+    def embed_documents(self, texts):
+        return self.chunks[[int(t) for t in texts]]
+
+    def embed_query(self, text):
+        return self.queries[int(text[1:])]
+
+
+def _normalize(matrix):
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
+
+
+def _noise(rng, shape, norm):
+    """Gaussian noise whose rows have roughly the given L2 norm."""
+    return (rng.standard_normal(shape) * norm / np.sqrt(shape[1])).astype(np.float32)
+
+
+def _corpus(resumes, chunks_per_resume, dim, roles, queries, seed):
+    rng = np.random.default_rng(seed)
+    centroids = _normalize(rng.standard_normal((roles, dim)).astype(np.float32))
+    resume_vecs = _normalize(centroids[rng.integers(0, roles, resumes)] + _noise(rng, (resumes, dim), 0.5))
+    chunks = np.repeat(resume_vecs, chunks_per_resume, axis=0)
+    chunks = _normalize(chunks + _noise(rng, chunks.shape, 0.7))
+    query_vecs = _normalize(centroids[rng.integers(0, roles, queries)] + _noise(rng, (queries, dim), 0.5))
+    return chunks, query_vecs
+
+
+def _exact_top(chunks, queries, chunks_per_resume, top_n):
+    """Exact top_n resume ids per query, scoring each resume by its best chunk."""
+    tops = []
+    for query in queries:
+        best = (chunks @ query).reshape(-1, chunks_per_resume).max(axis=1)
+        top = np.argpartition(-best, top_n)[:top_n]
+        tops.append({str(i) for i in top})
+    return tops
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--resumes", type=int, default=20000)
+    parser.add_argument("--chunks", type=int, default=8, help="Chunk vectors per resume")
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--roles", type=int, default=200, help="Distinct role clusters in the synthetic corpus")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-n", type=int, default=50)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 8, 16, 32, 64])
+    parser.add_argument("--codec", default="SQ8", help="FAISS codec for the IVF lists, e.g. SQ8 or Flat")
+    parser.add_argument("--batch", type=int, default=2000, help="Resumes per add_resumes call")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    chunks, queries = _corpus(args.resumes, args.chunks, args.dim, args.roles, args.queries, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        pool = TalentPool(_SyntheticEmbeddings(chunks, queries), lambda text: text.split(),
+                          path=f"{tmp}/pool.faiss", codec=args.codec)
+        started = time.perf_counter()
+        for first in range(0, args.resumes, args.batch):
+            batch = range(first, min(first + args.batch, args.resumes))
+            pool.add_resumes({
+                str(r): " ".join(str(c) for c in range(r * args.chunks, (r + 1) * args.chunks)) for r in batch
+            })
+        build_seconds = time.perf_counter() - started
+        index = "IVF" if pool.is_ann else "flat"
+        print(f"{len(pool)} resumes, {pool.index.ntotal} chunk vectors, {index} index "
+              f"(trained at {pool.trained_at}), built in {build_seconds:.1f}s\n")
+
+        exact = _exact_top(chunks, queries, args.chunks, args.top_n)
+        print(f"{'nprobe':>6} {'p50 ms':>8} {'p95 ms':>8} {'recall@' + str(args.top_n):>10} {'<' + str(TARGET_MS) + 'ms':>7}")
+        for nprobe in args.nprobe if pool.is_ann else [None]:
+            pool.search("q0", args.top_n, nprobe=nprobe)  # warm-up
+            latencies, recalls = [], []
+            for j, expected in enumerate(exact):
+                started = time.perf_counter()
+                hits = pool.search(f"q{j}", args.top_n, nprobe=nprobe)
+                latencies.append((time.perf_counter() - started) * 1000)
+                recalls.append(len(expected & {h["resume_id"] for h in hits}) / args.top_n)
+            p95 = np.percentile(latencies, 95)
+            print(f"{nprobe or '-':>6} {np.percentile(latencies, 50):>8.2f} {p95:>8.2f} "
+                  f"{np.mean(recalls):>10.3f} {'yes' if p95 < TARGET_MS else 'no':>7}")
+
+
+if __name__ == "__main__":
+    main()
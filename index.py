@@ -1,20 +1,27 @@
+import asyncio
 import warnings
 import streamlit as st
 import os
-import json
-import re
+import time
 from dotenv import load_dotenv
-from streamlit_agraph import agraph
 from annotated_text import annotated_text
 from src.ui_styles import apply_custom_css, display_metric_card
-from src.pdf_handler import extract_text_from_pdf
-from src.llm_engine import CareerAI
-from src.graph_builder import build_skill_graph
-from src.pdf_gen import create_pdf_report
-from src.web_search import get_company_info
+from src.embedding_config import EMBEDDING_BACKEND, EMBEDDING_MODEL, embedding_key
+from src.embedding_cache import get_embedding_cache
+from src.pdf_handler import MAX_PAGES, text_cache_stats
+from src.keyword_matcher import get_skill_matcher
+from src.heatmap import annotate, spans_to_parts
+from src.resume_parser import parse_resume, select_sections, to_compact_text
+from src.token_budget import TokenUsage, track_session_usage
+from src.rate_limiter import get_rate_limiter
+from src.web_search import (
+    dedupe_skills, iter_skill_resources, prefetch_company_info, start_skill_resources, youtube_search_url
+)
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 warnings.filterwarnings("ignore", module="duckduckgo_search")
+# LLM/vector (langchain, FAISS), reportlab, DuckDuckGo and agraph imports are deferred to
+# first use so the landing page renders without them; see benchmarks/bench_startup.py.
 
 st.set_page_config(page_title="CareerForge AI", page_icon="🚀", layout="wide")
 load_dotenv()
@@ -22,23 +29,63 @@ apply_custom_css()
 
 # CACHING & STATE MANAGEMENT
 
-@st.cache_resource(show_spinner="Loading AI Models...")
-def get_agent(model_name, temperature, api_key):
+# Cheap to build: the embedding model is a process-wide singleton and ChatGroq is created on first use.
+@st.cache_resource(show_spinner=False)
+def get_agent(model_name, temperature, api_key, retrieval_k=0):
     if api_key:
         os.environ["GROQ_API_KEY"] = api_key
-    return CareerAI(model_name=model_name, temperature=temperature)
+    from src.llm_engine import CareerAI
+    return CareerAI(model_name=model_name, temperature=temperature, retrieval_k=retrieval_k)
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def local_skill_match(resume_text, job_desc):
+    """Vocabulary match plus ready-to-render heatmap parts, memoised across reruns."""
+    match = get_skill_matcher().match(resume_text, job_desc)
+    return match, spans_to_parts(resume_text, match["resume_spans"])
+
+@st.cache_data(max_entries=16, show_spinner=False)
+def resume_structure(resume_bytes):
+    """Layout-aware parse of the uploaded PDF, keyed on its bytes; None if the layout can't be read."""
+    try:
+        return parse_resume(resume_bytes)
+    except Exception as e:
+        print(f"DEBUG: Resume parse failed: {e}")
+        return None
+
+def resume_for(task=None, include_contact=False):
+    """
+    Compact structured resume with only the sections a task needs; flat text as fallback.
+    include_contact keeps the name/contact header (signed letters, whole-resume rewrites).
+    """
+    if retrieval_k:
+        return st.session_state.resume_text  # the agent retrieves from the indexed full text itself
+    parsed = resume_structure(st.session_state.resume_bytes) if st.session_state.resume_bytes else None
+    if not parsed or not parsed["sections"]:
+        return st.session_state.resume_text
+    return to_compact_text(select_sections(parsed, task) if task else parsed, include_contact=include_contact)
 
 def init_session_state():
     defaults = {
         "resume_text": None, "job_desc": None, "analysis_result": None,
         "graph_data": None, "interview_q": None, "matched_keywords": [],
-        "history": [], "company_context": "", "match_score": 0, "tailored_resume": None
+        "history": [], "company_context": "", "match_score": 0, "tailored_resume": None,
+        "insights": None, "resume_bytes": None, "token_usage": TokenUsage()
     }
     for key, value in defaults.items():
         if key not in st.session_state:
             st.session_state[key] = value
 
 init_session_state()
+# The agent is shared across sessions; this routes its token accounting to ours too.
+track_session_usage(st.session_state.token_usage)
+
+def store_insights(insights):
+    """One structured extraction feeds the Heatmap, Skill Graph, Interview and Up-Skill tabs."""
+    st.session_state.insights = insights
+    st.session_state.graph_data = {
+        "present_skills": insights["present_skills"], "missing_skills": insights["missing_skills"]
+    } if insights else None
+    st.session_state.matched_keywords = insights["matched_keywords"] if insights else []
 
 # UI COMPONENTS
 
@@ -62,10 +109,18 @@ def render_sidebar():
         model = st.selectbox("🧠 AI Model", ["llama-3.3-70b-versatile", "llama-3.1-8b-instant"])
         persona = st.selectbox("🎭 Reviewer Persona", ["HR Recruiter", "Senior Engineer", "CTO"])
         temp = st.slider("🌡️ Creativity Level", 0.0, 1.0, 0.1)
+        retrieval_k = 0
+        if st.toggle("🎯 Focused Context", help="Send only the resume chunks that best match each JD requirement. "
+                                                "Much smaller prompts for long resumes."):
+            retrieval_k = st.slider("Chunks per requirement", 1, 5, 2)
         
         st.divider()
         st.markdown("### 🏢 Target Intelligence")
-        company_name = st.text_input("Target Company", placeholder="e.g. Netflix, OpenAI")
+        # Research starts as soon as the field changes, so it's usually cached by the time Analyze runs.
+        company_name = st.text_input(
+            "Target Company", placeholder="e.g. Netflix, OpenAI", key="target_company",
+            on_change=lambda: prefetch_company_info(st.session_state.target_company)
+        )
         
         if st.session_state.history:
             st.divider()
@@ -79,16 +134,29 @@ def render_sidebar():
                 </div>
                 """, unsafe_allow_html=True)
 
+        cache_stats = get_embedding_cache(embedding_key(EMBEDDING_MODEL, EMBEDDING_BACKEND)).stats()
+        st.caption(f"🧮 Embedding cache: {cache_stats['hits']} hits / {cache_stats['misses']} misses "
+                   f"({cache_stats['entries']}/{cache_stats['capacity']} vectors)")
+        st.caption(f"📄 PDF text cache: {text_cache_stats['hits']} hits / {text_cache_stats['misses']} misses "
+                   f"({text_cache_stats['extract_seconds']:.1f}s spent parsing)")
+        usage = st.session_state.token_usage.totals()
+        st.caption(f"🪙 Session tokens: {usage['prompt_tokens']:,} in / {usage['completion_tokens']:,} out "
+                   f"over {usage['calls']} calls (${usage['cost']:.4f})")
+        limits = get_rate_limiter("chat").stats()
+        st.caption(f"🚦 Groq limiter: {limits['avg_queue_wait']:.2f}s avg queue wait "
+                   f"(max {limits['max_queue_wait']:.1f}s), {limits['retries']} retries, {limits['failures']} failures")
+
         if st.session_state.analysis_result:
             st.divider()
             missing = st.session_state.graph_data.get('missing_skills', []) if st.session_state.graph_data else []
+            from src.pdf_gen import create_pdf_report
             pdf_file = create_pdf_report(
                 name="Candidate", score=st.session_state.match_score, 
                 analysis=st.session_state.analysis_result, missing_skills=missing
             )
             st.download_button("📄 Download Report PDF", pdf_file, "CareerForge_Report.pdf", "application/pdf")
             
-        return model, temp, persona, company_name, api_key
+        return model, temp, persona, company_name, api_key, retrieval_k
 
 def render_hero():
     # CYBERPUNK TITLE STYLE
@@ -121,9 +189,15 @@ def render_inputs():
         st.markdown("</div>", unsafe_allow_html=True)
     return uploaded_file, job_desc
 
+def render_latency(stream):
+    # Metrics of this session's own call; the agent is shared, so its log isn't.
+    m = stream.metrics
+    if m:
+        st.caption(f"⏱️ First token {m['ttft']:.2f}s · Total {m['total']:.2f}s" + (" · cached" if m["cached"] else ""))
+
 # MAIN EXECUTION FLOW
 
-model_name, temperature, persona_role, target_company, api_key = render_sidebar()
+model_name, temperature, persona_role, target_company, api_key, retrieval_k = render_sidebar()
 render_hero()
 resume_file, job_description = render_inputs()
 
@@ -139,26 +213,32 @@ if c2.button("🔍 Analyze & Optimize Profile", type="primary", use_container_wi
     else:
         with st.status("🚀 Launching CareerForge Analysis...", expanded=True) as status:
             try:
-                agent = get_agent(model_name, temperature, api_key)
-                status.write("📄 Extracting text from resume...")
-                text = extract_text_from_pdf(resume_file)
-                status.write(f"🏢 Researching {target_company if target_company else 'target company'}...")
-                context = ""
-                if target_company:
-                    context = get_company_info(target_company)
-                    if not context:
-                        context = agent.generate_company_insight(target_company)
-                st.session_state.company_context = context
-                status.write("🧠 Performing semantic gap analysis...")
-                agent.create_knowledge_base(text)
-                score = agent.calculate_similarity(job_description)
-                analysis = agent.analyze_profile(text, job_description, persona_role)
+                agent = get_agent(model_name, temperature, api_key, retrieval_k)
+                status.write(f"📄 Extracting resume, 🏢 researching {target_company if target_company else 'target company'} "
+                             "and 🧠 running semantic gap analysis in parallel...")
+                # The report streams in here while the score, insights and company research finish.
+                draft, preview = [], st.empty()
+
+                def show_token(token):
+                    draft.append(token)
+                    preview.markdown("".join(draft))
+
+                result = asyncio.run(agent.run_analysis(resume_file, job_description, persona_role, target_company,
+                                                        on_token=show_token))
+                preview.empty()
+                text, score, analysis = result.resume_text, result.match_score, result.analysis
+                st.session_state.company_context = result.company_context
+                status.write(f"⏱️ Finished in {result.timings['total']:.1f}s")
+                if result.pages_skipped:
+                    st.warning(f"⚠️ Only the first {MAX_PAGES} pages of your resume were analysed "
+                               f"({result.pages_skipped} more were skipped).")
                 
                 st.session_state.resume_text = text
+                st.session_state.resume_bytes = resume_file.getvalue()
                 st.session_state.job_desc = job_description
                 st.session_state.match_score = score
                 st.session_state.analysis_result = analysis
-                st.session_state.graph_data = None 
+                store_insights(result.insights)
                 st.session_state.tailored_resume = None
                 
                 st.session_state.history.append({
@@ -188,44 +268,61 @@ if st.session_state.analysis_result:
         "🎙️ Interview", "📧 Cold Email", "✍️ Rewrite", "🎓 Up-Skill"
     ])
     
-    agent = get_agent(model_name, temperature, api_key)
+    agent = get_agent(model_name, temperature, api_key, retrieval_k)
     
     with tabs[0]:
         st.markdown("### 📑 AI Consultant Report")
-        st.markdown(st.session_state.analysis_result)
+        if st.button("🔄 Regenerate Report"):
+            # refresh: a cached report at temperature 0 would just replay the one already shown.
+            stream = agent.stream_analyze_profile(st.session_state.resume_text, st.session_state.job_desc, persona_role,
+                                                  refresh=True)
+            st.session_state.analysis_result = st.write_stream(stream)
+            render_latency(stream)
+        else:
+            st.markdown(st.session_state.analysis_result)
+        if st.session_state.insights:
+            st.caption(f"🧮 Structured fit score: {st.session_state.insights['score']}/100")
         if st.session_state.company_context:
             st.info("💡 **Company Context Used:**")
             st.markdown(st.session_state.company_context)
 
     with tabs[1]:
         st.subheader("🔥 ATS Keyword Heatmap")
-        if st.button("Generate Heatmap"):
+        # Local vocabulary match: instant and free; the LLM keywords are an optional extra.
+        local_match, local_parts = local_skill_match(st.session_state.resume_text, st.session_state.job_desc)
+        st.caption(f"⚡ {len(local_match['matched'])} JD skills found in your resume · "
+                   f"Missing: {', '.join(local_match['missing'][:10]) or 'none'}")
+        enrich = st.toggle("✨ Enrich with AI-suggested keywords")
+        if enrich and not st.session_state.insights and st.button("Generate Heatmap"):
             with st.spinner("Scanning..."):
-                keywords = agent.extract_matched_keywords(st.session_state.resume_text, st.session_state.job_desc)
-                st.session_state.matched_keywords = keywords
+                try:
+                    store_insights(agent.extract_profile_insights(st.session_state.resume_text, st.session_state.job_desc))
+                except Exception as e:
+                    st.error(f"Heatmap generation failed: {e}")
         
-        if st.session_state.matched_keywords:
-            pattern = re.compile(f"({'|'.join([re.escape(k) for k in st.session_state.matched_keywords])})", re.IGNORECASE)
-            annotated_parts = []
-            for part in pattern.split(st.session_state.resume_text):
-                if part.lower() in [k.lower() for k in st.session_state.matched_keywords]:
-                    # CHANGED COLOR FROM #8ef to #ff00ff (Neon Pink) to match theme
-                    annotated_parts.append((part, "MATCH", "#ff00ff"))
-                else:
-                    annotated_parts.append(part)
-            annotated_text(*annotated_parts)
+        if enrich and st.session_state.matched_keywords:
+            keywords = list(dict.fromkeys(
+                [st.session_state.resume_text[start:end] for start, end, _ in local_match["resume_spans"]]
+                + st.session_state.matched_keywords
+            ))
+            annotated_text(*annotate(st.session_state.resume_text, keywords))
+        elif local_match["resume_spans"]:
+            annotated_text(*local_parts)
+        else:
+            st.info("None of the JD's skills from our vocabulary appear in your resume yet.")
 
     with tabs[2]:
         st.subheader("🕸️ Skill Gap Visualization")
-        if st.button("Generate Graph"):
+        if not st.session_state.insights and st.button("Generate Graph"):
             with st.spinner("Mapping Skills..."):
                 try:
-                    json_str = agent.extract_skills_json(st.session_state.resume_text, st.session_state.job_desc)
-                    st.session_state.graph_data = json.loads(json_str)
+                    store_insights(agent.extract_profile_insights(st.session_state.resume_text, st.session_state.job_desc))
                 except Exception as e:
                     st.error(f"Graph generation failed: {e}")
         
         if st.session_state.graph_data:
+            from streamlit_agraph import agraph
+            from src.graph_builder import build_skill_graph
             nodes, edges, config = build_skill_graph(
                 st.session_state.graph_data.get('present_skills', []), 
                 st.session_state.graph_data.get('missing_skills', [])
@@ -235,25 +332,28 @@ if st.session_state.analysis_result:
     with tabs[3]:
         st.subheader("📝 Cover Letter Generator")
         if st.button("Generate Cover Letter"):
-            with st.spinner("Drafting..."):
-                letter = agent.generate_cover_letter(st.session_state.resume_text, st.session_state.job_desc)
-                st.text_area("Draft:", letter, height=400)
-                st.download_button("📥 Download", letter, "Cover_Letter.txt")
+            stream = agent.stream_cover_letter(resume_for("cover_letter", include_contact=True), st.session_state.job_desc)
+            with st.container(border=True):
+                letter = st.write_stream(stream)
+            render_latency(stream)
+            st.download_button("📥 Download", letter, "Cover_Letter.txt")
 
     with tabs[4]:
         st.subheader("🎙️ AI Technical Interviewer")
         if st.button("Generate Question"):
             with st.spinner("Thinking..."):
                 skills = ", ".join(st.session_state.graph_data.get('missing_skills', [])) if st.session_state.graph_data else "general gaps"
-                st.session_state.interview_q = agent.generate_interview_question(st.session_state.job_desc, skills)
+                st.session_state.interview_q = agent.generate_interview_question(st.session_state.job_desc, skills, st.session_state.resume_text)
         
         if st.session_state.interview_q:
             st.markdown(f"**Q:** *{st.session_state.interview_q}*")
             audio = st.audio_input("Record Answer")
             if audio:
                 with st.spinner("Grading..."):
-                    text = agent.transcribe_audio(audio.read())
+                    started = time.perf_counter()
+                    text = agent.transcribe_audio(audio.getvalue())
                     st.success(f"**You said:** {text}")
+                    st.caption(f"🎧 Transcribed in {time.perf_counter() - started:.2f}s")
                     st.markdown(agent.evaluate_interview_answer(st.session_state.interview_q, text))
 
     with tabs[5]:
@@ -261,7 +361,7 @@ if st.session_state.analysis_result:
         recipient = st.selectbox("Recipient", ["Hiring Manager", "Technical Recruiter", "Alumni / Peer"])
         if st.button("Draft Cold Email"):
             with st.spinner("Drafting..."):
-                draft = agent.generate_cold_email(st.session_state.resume_text, st.session_state.job_desc, st.session_state.company_context, recipient)
+                draft = agent.generate_cold_email(resume_for("cold_email"), st.session_state.job_desc, st.session_state.company_context, recipient)
                 st.text_area("Draft:", draft, height=250)
 
     with tabs[6]:
@@ -271,15 +371,14 @@ if st.session_state.analysis_result:
         if mode == "Targeted Summary":
             if st.button("✨ Rewrite Summary"):
                 with st.spinner("Refining..."):
-                    res = agent.llm.invoke(f"Rewrite resume summary for {target_company} job: {st.session_state.job_desc[:300]}... Original: {st.session_state.resume_text[:500]}").content
+                    res = agent.rewrite_summary(resume_for("cold_email"), st.session_state.job_desc, target_company)
                     st.success(res)
         else:
             if st.button("🚀 Tailor Entire Resume"):
-                with st.spinner("Optimizing..."):
-                    try:
-                        st.session_state.tailored_resume = agent.tailor_resume(st.session_state.resume_text, st.session_state.job_desc)
-                    except AttributeError:
-                        st.error("Error: `tailor_resume` not found in `src/llm_engine.py`.")
+                stream = agent.stream_tailor_resume(resume_for(include_contact=True), st.session_state.job_desc)
+                with st.container(border=True):
+                    st.session_state.tailored_resume = st.write_stream(stream)
+                render_latency(stream)
             
             if st.session_state.tailored_resume:
                 st.divider()
@@ -290,7 +389,11 @@ if st.session_state.analysis_result:
         st.subheader("🚀 Accelerated Learning Plan")
         if st.button("Generate Roadmap"):
             with st.spinner("Planning & Finding Resources..."):
-                skills = ", ".join(st.session_state.graph_data.get('missing_skills', [])) if st.session_state.graph_data else "General"
+                missing_skills = st.session_state.graph_data.get('missing_skills', []) if st.session_state.graph_data else []
+                # Start the tutorial searches first so they run while the LLM writes the roadmap.
+                resource_skills = dedupe_skills(missing_skills)[:5]  # Limit to first 5 skills
+                lookups = start_skill_resources(resource_skills)
+                skills = ", ".join(missing_skills) if st.session_state.graph_data else "General"
                 
                 # Generate learning plan
                 roadmap = agent.generate_learning_plan(skills)
@@ -298,24 +401,17 @@ if st.session_state.analysis_result:
                 
                 # Fetch YouTube tutorials for missing skills
                 st.subheader("📺 Recommended YouTube Tutorials")
-                missing_skills = st.session_state.graph_data.get('missing_skills', []) if st.session_state.graph_data else []
                 
                 if missing_skills:
-                    for skill in missing_skills[:5]:  # Limit to first 5 skills
-                        try:
-                            # Search for YouTube tutorials
-                            search_query = f"{skill} tutorial"
-                            youtube_results = get_company_info(search_query)  # Reuse web search
-                            
-                            if youtube_results:
-                                st.markdown(f"**{skill}**")
-                                st.markdown(youtube_results)
-                            else:
-                                # Fallback: Create YouTube search link
-                                youtube_link = f"https://www.youtube.com/results?search_query={skill.replace(' ', '+')}+tutorial"
-                                st.markdown(f"**{skill}** - [Search YouTube →]({youtube_link})")
-                        except Exception as e:
-                            youtube_link = f"https://www.youtube.com/results?search_query={skill.replace(' ', '+')}+tutorial"
-                            st.markdown(f"**{skill}** - [Search YouTube →]({youtube_link})")
+                    # Results fill in as each search finishes, in skill order.
+                    slots = {skill: st.empty() for skill in resource_skills}
+                    for skill in resource_skills:
+                        slots[skill].markdown(f"**{skill}** - ⏳ searching...")
+                    for skill, resources in iter_skill_resources(lookups):
+                        if resources:
+                            slots[skill].markdown(f"**{skill}**\n{resources}")
+                        else:
+                            # Fallback: Create YouTube search link
+                            slots[skill].markdown(f"**{skill}** - [Search YouTube →]({youtube_search_url(skill)})")
                 else:
                     st.info("No missing skills identified. You're all set!")
\ No newline at end of file
@@ -9,20 +9,20 @@ import os
 import json
 import re
 from dotenv import load_dotenv
-from streamlit_agraph import agraph
 from annotated_text import annotated_text
 from src.ui_styles import apply_custom_css, display_metric_card
-from src.pdf_handler import extract_text_from_pdf
-from src.llm_engine import CareerAI
-from src.graph_builder import build_skill_graph
-from src.pdf_gen import create_pdf_report
-from src.web_search import get_company_info
+from src.pdf_handler import MAX_PAGES, extract_text_cached
 
 # 1. Config & Setup
 st.set_page_config(page_title="CareerForge AI", page_icon="🚀", layout="wide")
 load_dotenv()
 apply_custom_css()
 
+@st.cache_resource(show_spinner=False)
+def get_agent(model_name, temperature):
+    from src.llm_engine import CareerAI  # deferred: langchain/FAISS load on first analysis
+    return CareerAI(model_name, temperature)
+
 # 2. Session State Initialization
 if "resume_text" not in st.session_state: st.session_state.resume_text = None
 if "job_desc" not in st.session_state: st.session_state.job_desc = None
@@ -84,6 +84,7 @@ with st.sidebar:
         if st.session_state.graph_data:
             missing = st.session_state.graph_data.get('missing_skills', [])
         
+        from src.pdf_gen import create_pdf_report
         pdf_file = create_pdf_report(
             name="Candidate", 
             score=st.session_state.match_score, 
@@ -131,14 +132,17 @@ if analyze_btn:
     if uploaded_file and job_desc and os.getenv("GROQ_API_KEY"):
         with st.spinner("🚀 Analyzing Profile & Researching Company..."):
             try:
-                # Init Agent
-                agent = CareerAI(model, temp)
-                text = extract_text_from_pdf(uploaded_file)
+                agent = get_agent(model, temp)
+                text, extraction = extract_text_cached(uploaded_file)
+                if extraction["pages_skipped"]:
+                    st.warning(f"⚠️ Only the first {MAX_PAGES} pages of your resume were analysed "
+                               f"({extraction['pages_skipped']} more were skipped).")
                 
                 # --- SMART COMPANY SEARCH ---
                 company_context = ""
                 if company_name:
                     # 1. Try Web Search
+                    from src.web_search import get_company_info
                     web_data = get_company_info(company_name)
                     
                     if web_data:
@@ -152,8 +156,8 @@ if analyze_btn:
                 # ----------------------------
                 
                 # Run Core Analysis Pipeline
-                agent.create_knowledge_base(text)
-                score = agent.calculate_similarity(job_desc)
+                _, matrix = agent.create_knowledge_base(text)
+                score = agent.calculate_similarity(job_desc, matrix=matrix)
                 analysis = agent.analyze_profile(text, job_desc, persona)
                 
                 # Update Session State
@@ -202,8 +206,8 @@ if st.session_state.analysis_result:
         "🎓 Up-Skill"
     ])
     
-    # Re-init agent for tab interactions
-    agent = CareerAI(model, temp)
+    # Same cached agent the analysis used
+    agent = get_agent(model, temp)
     
     # --- TAB 1: Analysis Report ---
     with tabs[0]:
@@ -248,6 +252,8 @@ if st.session_state.analysis_result:
                 except: st.error("Failed to parse graph data.")
         
         if st.session_state.graph_data:
+            from streamlit_agraph import agraph
+            from src.graph_builder import build_skill_graph
             nodes, edges, config = build_skill_graph(
                 st.session_state.graph_data.get('present_skills', []), 
                 st.session_state.graph_data.get('missing_skills', [])
@@ -324,8 +330,8 @@ if st.session_state.analysis_result:
             st.info("Best for quick LinkedIn updates or intro emails.")
             if st.button("✨ Rewrite Summary Only"):
                 with st.spinner("Refining professional summary..."):
-                    prompt = f"Rewrite resume summary for {company_name} job: {st.session_state.job_desc[:300]}... Original: {st.session_state.resume_text[:500]}"
-                    res = agent.llm.invoke(prompt).content
+                    # Goes through the agent so the shared rate limiter, budgets and cache apply.
+                    res = agent.rewrite_summary(st.session_state.resume_text, st.session_state.job_desc, company_name)
                     st.markdown("### 📝 Optimized Summary")
                     st.success(res)
                     st.code(res, language='markdown')
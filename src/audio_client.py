@@ -0,0 +1,69 @@
+import os
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+import numpy as np
+
+from src.rate_limiter import get_rate_limiter
+
+WHISPER_MODEL = "whisper-large-v3"
+AUDIO_CONNECTIONS = int(os.getenv("CAREERFORGE_WHISPER_CONNECTIONS", "8"))
+
+
+class AudioClient:
+    """
+    Long-lived Groq client for Whisper: one keep-alive HTTP connection pool shared by
+    every session, uploads straight from memory, safe to call from many threads.
+    """
+
+    def __init__(self, api_key, max_connections=AUDIO_CONNECTIONS, timeout=60.0):
+        import httpx
+        from groq import Groq
+
+        self.client = Groq(
+            api_key=api_key,
+            max_retries=0,  # the shared audio limiter retries with backoff
+            http_client=httpx.Client(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+                timeout=timeout
+            )
+        )
+        self.limiter = get_rate_limiter("audio")
+        self._lock = threading.Lock()
+        self.metrics = deque(maxlen=200)  # per call: seconds, bytes, ok
+
+    def transcribe(self, audio_bytes, filename="answer.wav", model=WHISPER_MODEL):
+        """Transcribes in-memory audio; the filename extension tells the API the format."""
+        started, ok = time.perf_counter(), False
+        try:
+            result = self.limiter.call(
+                self.client.audio.transcriptions.create,
+                file=(filename, audio_bytes), model=model, response_format="json"
+            )
+            ok = True
+            return result.text
+        finally:
+            with self._lock:
+                self.metrics.append({"seconds": time.perf_counter() - started, "bytes": len(audio_bytes), "ok": ok})
+
+    def stats(self):
+        with self._lock:
+            metrics = list(self.metrics)
+        if not metrics:
+            return {"calls": 0, "errors": 0, "avg_seconds": 0.0, "p95_seconds": 0.0, "avg_bytes": 0}
+        seconds = [m["seconds"] for m in metrics]
+        return {
+            "calls": len(metrics),
+            "errors": sum(not m["ok"] for m in metrics),
+            "avg_seconds": float(np.mean(seconds)),
+            "p95_seconds": float(np.percentile(seconds, 95)),
+            "avg_bytes": int(np.mean([m["bytes"] for m in metrics])),
+        }
+
+
+@lru_cache(maxsize=None)
+def get_audio_client(api_key):
+    """One pooled client per API key for the whole process."""
+    return AudioClient(api_key)
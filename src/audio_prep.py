@@ -0,0 +1,118 @@
+"""
+Local preprocessing for recorded answers before they are sent to Whisper:
+decode WAV, downmix to mono, resample to 16 kHz, trim leading/trailing silence by
+frame energy, and split long answers at pauses into 16-bit PCM WAV segments.
+"""
+import io
+import os
+import wave
+
+import numpy as np
+
+TARGET_RATE = 16000  # Whisper resamples to 16 kHz anyway; sending more is wasted upload
+FRAME_SECONDS = 0.03
+# Frames this far below the loudest frame count as silence.
+SILENCE_DB = float(os.getenv("CAREERFORGE_SILENCE_DB", "-35"))
+PAD_SECONDS = 0.2
+# Answers longer than this are split at pauses and transcribed in parallel.
+SEGMENT_SECONDS = float(os.getenv("CAREERFORGE_AUDIO_SEGMENT_SECONDS", "20"))
+# How far from the ideal cut point to look for a pause.
+SEARCH_SECONDS = 6.0
+
+
+def decode_wav(audio_bytes):
+    """(float32 samples in [-1, 1] shaped (frames, channels), sample rate) from PCM WAV bytes."""
+    with wave.open(io.BytesIO(audio_bytes)) as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 3:
+        bytes_ = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        ints = (bytes_[:, 0].astype(np.int32) | (bytes_[:, 1].astype(np.int32) << 8) | (bytes_[:, 2].astype(np.int32) << 16))
+        samples = (np.where(ints & 0x800000, ints - 0x1000000, ints) / 2 ** 23).astype(np.float32)
+    else:
+        dtype = {2: np.int16, 4: np.int32}[width]
+        samples = np.frombuffer(raw, dtype=dtype).astype(np.float32) / np.iinfo(dtype).max
+    return samples.reshape(-1, channels), rate
+
+
+def to_mono_16k(samples, rate):
+    """Averages channels and resamples to TARGET_RATE, low-passing first when downsampling."""
+    mono = samples.mean(axis=1) if samples.ndim == 2 else samples
+    if rate == TARGET_RATE or not len(mono):
+        return mono.astype(np.float32)
+    if rate > TARGET_RATE:
+        # Hann-windowed sinc at the new Nyquist frequency keeps aliasing out of the speech band.
+        cutoff = TARGET_RATE / rate / 2
+        taps = np.arange(-32, 33)
+        kernel = 2 * cutoff * np.sinc(2 * cutoff * taps) * np.hanning(len(taps))
+        mono = np.convolve(mono, kernel / kernel.sum(), mode="same")
+    positions = np.arange(0, len(mono) * TARGET_RATE / rate) * rate / TARGET_RATE
+    return np.interp(positions, np.arange(len(mono)), mono).astype(np.float32)
+
+
+def frame_energy_db(samples, rate=TARGET_RATE):
+    """RMS level per FRAME_SECONDS frame in dB relative to the loudest frame."""
+    size = max(1, int(rate * FRAME_SECONDS))
+    count = len(samples) // size
+    if not count:
+        return np.zeros(0, dtype=np.float32)
+    frames = samples[:count * size].reshape(count, size)
+    rms = np.sqrt(np.mean(frames ** 2, axis=1)) + 1e-10
+    return 20 * np.log10(rms / rms.max())
+
+
+def trim_silence(samples, rate=TARGET_RATE):
+    """Drops leading/trailing silence, keeping PAD_SECONDS around the speech. Empty if all silent."""
+    voiced = np.flatnonzero(frame_energy_db(samples, rate) > SILENCE_DB)
+    if not len(voiced) or np.sqrt(np.mean(samples ** 2)) < 1e-4:
+        return samples[:0]
+    size, pad = int(rate * FRAME_SECONDS), int(rate * PAD_SECONDS)
+    return samples[max(0, voiced[0] * size - pad):min(len(samples), (voiced[-1] + 1) * size + pad)]
+
+
+def split_at_pauses(samples, rate=TARGET_RATE, max_seconds=SEGMENT_SECONDS):
+    """Cuts roughly every max_seconds, at the quietest frame within SEARCH_SECONDS of each target."""
+    if len(samples) <= max_seconds * rate:
+        return [samples]
+    energy = frame_energy_db(samples, rate)
+    size = int(rate * FRAME_SECONDS)
+    per_segment, search = int(max_seconds / FRAME_SECONDS), int(SEARCH_SECONDS / FRAME_SECONDS)
+    cuts, start = [], 0
+    while len(energy) - start > per_segment:
+        target = start + per_segment
+        # Never leave a tail shorter than the search window; it would be a near-empty upload.
+        lo, hi = max(start + 1, target - search), min(len(energy) - search, target + search)
+        if hi <= lo:
+            break
+        cut = lo + int(np.argmin(energy[lo:hi]))
+        cuts.append(cut * size)
+        start = cut
+    bounds = [0] + cuts + [len(samples)]
+    return [samples[a:b] for a, b in zip(bounds, bounds[1:]) if b > a]
+
+
+def encode_wav(samples, rate=TARGET_RATE):
+    """16-bit mono PCM WAV bytes."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def prepare_segments(audio_bytes, max_seconds=SEGMENT_SECONDS):
+    """
+    Upload-ready WAV segments for a recorded answer, in order. Audio that isn't PCM
+    WAV is passed through untouched; an all-silent recording gives no segments.
+    """
+    try:
+        samples, rate = decode_wav(audio_bytes)
+    except (wave.Error, EOFError, KeyError, ValueError):
+        return [audio_bytes]
+    speech = trim_silence(to_mono_16k(samples, rate))
+    return [encode_wav(segment) for segment in split_at_pauses(speech, TARGET_RATE, max_seconds)] if len(speech) else []
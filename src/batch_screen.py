@@ -0,0 +1,151 @@
+"""
+Headless bulk screening: rank a folder of PDF resumes against one job description.
+
+    python -m src.batch_screen resumes/ --jd job.txt --out ranked.csv [--analyze-top 20]
+
+PDFs are parsed in a process pool and scored in large embedding batches. Rows are
+streamed to --out as each batch finishes; once the run completes the file is
+rewritten in rank order. LLM analysis is opt-in and only runs for the top K.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+from src.embedding_backends import BACKENDS
+from src.embedding_config import EMBEDDING_BACKEND
+from src.pdf_handler import extract_text_from_pdf
+from src.llm_engine import CareerAI
+
+FIELDS = ["rank", "score", "file", "words", "error"]
+
+
+def _extract(path):
+    """Worker: returns (path, text, error) so one bad PDF never kills the pool."""
+    try:
+        # Already inside a pool worker, so parse pages serially.
+        return path, extract_text_from_pdf(path, parallel=False), ""
+    except Exception as e:
+        return path, "", str(e)
+
+
+class _RowWriter:
+    """Writes result rows as CSV or JSONL depending on the output extension."""
+
+    def __init__(self, path):
+        self.path = path
+        self.jsonl = path.lower().endswith((".jsonl", ".json"))
+        self.handle = open(path, "w", newline="", encoding="utf-8")
+        if not self.jsonl:
+            self.csv = csv.DictWriter(self.handle, fieldnames=FIELDS)
+            self.csv.writeheader()
+
+    def write(self, row):
+        if self.jsonl:
+            self.handle.write(json.dumps(row) + "\n")
+        else:
+            self.csv.writerow(row)
+        self.handle.flush()
+
+    def close(self):
+        self.handle.close()
+
+
+def _write_ranked(path, rows):
+    ranked = sorted(rows, key=lambda r: (r["error"] != "", -r["score"], r["file"]))
+    tmp_path = path + ".tmp"
+    writer = _RowWriter(tmp_path)
+    for rank, row in enumerate(ranked, start=1):
+        writer.write({**row, "rank": rank})
+    writer.close()
+    os.replace(tmp_path, path)
+    return ranked
+
+
+def screen(resume_dir, job_desc, out_path, workers=None, batch_size=64, analyze_top=0,
+           persona="HR Recruiter", model_name="llama-3.3-70b-versatile", embedding_backend=EMBEDDING_BACKEND):
+    paths = sorted(str(p) for p in Path(resume_dir).rglob("*.pdf"))
+    if not paths:
+        raise SystemExit(f"No PDF files found in {resume_dir}")
+
+    agent = CareerAI(model_name=model_name, embedding_backend=embedding_backend)
+    writer = _RowWriter(out_path)
+    rows, batch = [], []
+    texts = {}  # path -> extracted text, kept only when the top K get an LLM analysis
+    started = time.perf_counter()
+
+    def flush(batch):
+        scores = agent.score_resumes([text for _, text, _ in batch], job_desc)
+        for (path, text, error), score in zip(batch, scores):
+            row = {"rank": "", "score": score, "file": path, "words": len(text.split()), "error": error}
+            rows.append(row)
+            writer.write(row)
+            if analyze_top and text:
+                texts[path] = text
+        elapsed = time.perf_counter() - started
+        print(f"\r{len(rows)}/{len(paths)} resumes  {len(rows) / elapsed:.1f}/s", end="", file=sys.stderr)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for result in pool.map(_extract, paths, chunksize=8):
+                batch.append(result)
+                if len(batch) >= batch_size:
+                    flush(batch)
+                    batch = []
+            if batch:
+                flush(batch)
+    finally:
+        writer.close()
+
+    elapsed = time.perf_counter() - started
+    ranked = _write_ranked(out_path, rows)
+    failed = sum(1 for r in rows if r["error"])
+    print(f"\nScreened {len(rows)} resumes in {elapsed:.1f}s "
+          f"({len(rows) / elapsed:.1f} resumes/sec, {failed} failed) -> {out_path}", file=sys.stderr)
+
+    if analyze_top:
+        analysis_path = str(Path(out_path).with_suffix("")) + ".analysis.jsonl"
+        with open(analysis_path, "w", encoding="utf-8") as f:
+            for rank, row in enumerate(ranked[:analyze_top], start=1):
+                text = texts.get(row["file"])
+                if not text: continue
+                analysis = agent.analyze_profile(text, job_desc, persona)
+                f.write(json.dumps({"rank": rank, "file": row["file"], "score": row["score"], "analysis": analysis}) + "\n")
+                f.flush()
+                print(f"Analyzed {rank}/{analyze_top}: {row['file']}", file=sys.stderr)
+        print(f"LLM analysis for top {analyze_top} -> {analysis_path}", file=sys.stderr)
+    return ranked
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Rank a folder of PDF resumes against one job description.")
+    parser.add_argument("resume_dir", help="Folder searched recursively for *.pdf")
+    parser.add_argument("--jd", required=True, help="Path to a text file containing the job description")
+    parser.add_argument("--out", default="ranked.csv", help="Output file (.csv or .jsonl)")
+    parser.add_argument("--workers", type=int, default=None, help="PDF extraction processes (default: CPU count)")
+    parser.add_argument("--batch-size", type=int, default=64, help="Resumes per embed_documents call")
+    parser.add_argument("--analyze-top", type=int, default=0, help="Run LLM analysis on the top K resumes")
+    parser.add_argument("--persona", default="HR Recruiter", choices=["HR Recruiter", "Senior Engineer", "CTO"])
+    parser.add_argument("--model", default="llama-3.3-70b-versatile")
+    parser.add_argument("--embedding-backend", default=EMBEDDING_BACKEND, choices=list(BACKENDS),
+                        help="onnx-int8 needs CAREERFORGE_ONNX_MODEL_DIR")
+    args = parser.parse_args(argv)
+
+    load_dotenv()
+    if args.analyze_top and not os.getenv("GROQ_API_KEY"):
+        parser.error("--analyze-top needs GROQ_API_KEY")
+    with open(args.jd, encoding="utf-8") as f:
+        job_desc = f.read()
+    screen(args.resume_dir, job_desc, args.out, workers=args.workers, batch_size=args.batch_size,
+           analyze_top=args.analyze_top, persona=args.persona, model_name=args.model,
+           embedding_backend=args.embedding_backend)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+import re
+
+SECTION_HEADINGS = (
+    "summary", "professional summary", "profile", "objective", "experience", "work experience",
+    "professional experience", "employment history", "education", "skills", "technical skills",
+    "projects", "certifications", "publications", "awards", "achievements", "languages",
+    "volunteer experience", "interests",
+)
+
+
+def _alternation(names):
+    return "|".join(re.escape(n) for n in sorted(names, key=len, reverse=True))
+
+
+# Upper-case headings survive whitespace flattening, so they match after any space;
+# title-case ones only count at the start of a line.
+_HEADING = re.compile(
+    r"(?:^|(?<=\s))(" + _alternation({h.upper() for h in SECTION_HEADINGS}) + r")\b:?"
+    r"|(?:^|(?<=\n))(" + _alternation({h.title() for h in SECTION_HEADINGS}) + r")\b:?"
+)
+# Break points inside a section: newlines, bullet markers and sentence ends.
+_UNIT_BREAK = re.compile(r"\n+|\s+(?=[-*•▪●–]\s)|(?<=[.!?;])\s+(?=[A-Z0-9(])")
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+def approx_token_count(text):
+    """Word/punctuation count; a cheap, tokenizer-free stand-in for WordPiece length."""
+    return len(_TOKEN.findall(text))
+
+
+def iter_sections(text):
+    """Yields (heading, body) pairs; text before the first heading has heading None."""
+    start, heading = 0, None
+    for match in _HEADING.finditer(text):
+        if text[start:match.start()].strip():
+            yield heading, text[start:match.start()].strip()
+        heading, start = match.group(1) or match.group(2), match.start()
+    if text[start:].strip():
+        yield heading, text[start:].strip()
+
+
+def _iter_units(section, max_tokens, count_tokens):
+    """Sentence/bullet units, with any unit over budget split into word windows."""
+    for unit in _UNIT_BREAK.split(section):
+        unit = unit.strip()
+        if not unit:
+            continue
+        if count_tokens(unit) <= max_tokens:
+            yield unit
+            continue
+        # Close each window before the next word would take it over budget.
+        window = []
+        for word in unit.split():
+            if window and count_tokens(" ".join(window + [word])) > max_tokens:
+                yield " ".join(window)
+                window = []
+            window.append(word)
+        if window:
+            yield " ".join(window)
+
+
+def iter_chunks(text, max_tokens=180, overlap_tokens=20, min_section_tokens=24, count_tokens=approx_token_count):
+    """
+    Streams chunks that only break on section, sentence or bullet boundaries.
+    Sections shorter than `min_section_tokens` (e.g. a contact line) are folded into
+    the next one; consecutive chunks in a section share up to `overlap_tokens` of
+    trailing units. `max_tokens` should stay under the embedding model's window.
+    """
+    pending = ""
+    for _, section in iter_sections(text):
+        section = f"{pending} {section}".strip()
+        if count_tokens(section) < min_section_tokens:
+            pending = section
+            continue
+        pending = ""
+        units, size = [], 0
+        for unit in _iter_units(section, max_tokens, count_tokens):
+            unit_size = count_tokens(unit)
+            if units and size + unit_size > max_tokens:
+                yield " ".join(units)
+                # Carry trailing units forward as overlap, keeping room for the new unit.
+                carried, carried_size = [], 0
+                for prev in reversed(units):
+                    prev_size = count_tokens(prev)
+                    if carried_size + prev_size > overlap_tokens or carried_size + prev_size + unit_size > max_tokens:
+                        break
+                    carried.insert(0, prev)
+                    carried_size += prev_size
+                units, size = carried, carried_size
+            units.append(unit)
+            size += unit_size
+        if units:
+            yield " ".join(units)
+    if pending:
+        yield pending
+
+
+def iter_fixed_chunks(text, size=500):
+    """The original fixed-width character slicer."""
+    for i in range(0, len(text), size):
+        yield text[i:i + size]
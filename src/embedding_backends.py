@@ -0,0 +1,152 @@
+"""
+Embedding backends: anything implementing LangChain's embed_documents/embed_query.
+
+    CAREERFORGE_EMBEDDING_BACKEND=onnx-int8 CAREERFORGE_ONNX_MODEL_DIR=models/minilm-int8 streamlit run index.py
+
+"sentence-transformers" (default) runs the fp32 PyTorch model. "onnx-int8" runs a
+dynamically quantised ONNX export with onnxruntime on CPU, in length-sorted batches.
+Build its model directory once with:
+
+    python -m src.embedding_backends export --out models/minilm-int8
+"""
+import argparse
+import os
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.embedding_config import EMBEDDING_MODEL
+
+ONNX_MODEL_DIR = os.getenv("CAREERFORGE_ONNX_MODEL_DIR", "")
+# Preferred file first; an unquantised export still works, just slower.
+ONNX_FILES = ("model_quantized.onnx", "model_int8.onnx", "model.onnx")
+
+
+class EmbeddingBackend(Embeddings):
+    """Base for pluggable backends; `name` becomes part of every cache key built on its vectors."""
+
+    name = None
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+class SentenceTransformerBackend(EmbeddingBackend):
+    """The original HuggingFaceEmbeddings (fp32 PyTorch) path."""
+
+    name = "sentence-transformers"
+
+    def __init__(self, model_name):
+        from langchain_huggingface import HuggingFaceEmbeddings
+        self.model = HuggingFaceEmbeddings(model_name=model_name)
+
+    def embed_documents(self, texts):
+        return self.model.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.model.embed_query(text)
+
+
+class OnnxInt8Backend(EmbeddingBackend):
+    """
+    Int8 ONNX model from a local directory (model_quantized.onnx + tokenizer.json).
+    Mean pooling and L2 normalisation match the sentence-transformers MiniLM pipeline.
+    """
+
+    name = "onnx-int8"
+
+    def __init__(self, model_name=None, model_dir=None, batch_size=64, max_length=256):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_dir = model_dir or ONNX_MODEL_DIR
+        model_path = next((os.path.join(model_dir, f) for f in ONNX_FILES
+                           if model_dir and os.path.exists(os.path.join(model_dir, f))), None)
+        if model_path is None:
+            raise ValueError(f"No ONNX model found in {model_dir!r}; set CAREERFORGE_ONNX_MODEL_DIR "
+                             "or run `python -m src.embedding_backends export`.")
+        self.batch_size = batch_size
+        self.tokenizer = Tokenizer.from_file(os.path.join(model_dir, "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length)
+        self.tokenizer.enable_padding()  # to the longest text in each batch
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(model_path, options, providers=["CPUExecutionProvider"])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+
+    def _embed_batch(self, texts):
+        encodings = self.tokenizer.encode_batch(texts)
+        mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+        feeds = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": mask,
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64),
+        }
+        output = self.session.run(None, {k: v for k, v in feeds.items() if k in self.input_names})[0]
+        if output.ndim == 3:  # token embeddings -> mean over real tokens
+            weights = mask[..., None].astype(np.float32)
+            output = (output * weights).sum(axis=1) / np.maximum(weights.sum(axis=1), 1e-9)
+        return output / np.maximum(np.linalg.norm(output, axis=1, keepdims=True), 1e-12)
+
+    def embed_documents(self, texts):
+        if not texts:
+            return []
+        # Similar lengths share a batch, so little compute is spent on padding.
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        vectors = [None] * len(texts)
+        for start in range(0, len(order), self.batch_size):
+            batch = order[start:start + self.batch_size]
+            for i, vector in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                vectors[i] = vector.tolist()
+        return vectors
+
+
+BACKENDS = {
+    SentenceTransformerBackend.name: SentenceTransformerBackend,
+    OnnxInt8Backend.name: OnnxInt8Backend,
+}
+
+
+def load_backend(name, model_name):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}; choose from {', '.join(BACKENDS)}")
+    return BACKENDS[name](model_name)
+
+
+def export_onnx_int8(model_name, out_dir):
+    """Exports a sentence-transformers model to ONNX and quantises its weights to int8."""
+    import torch
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+    from transformers import AutoModel, AutoTokenizer
+
+    hf_name = model_name if "/" in model_name else f"sentence-transformers/{model_name}"
+    tokenizer = AutoTokenizer.from_pretrained(hf_name)
+    model = AutoModel.from_pretrained(hf_name).eval()
+    os.makedirs(out_dir, exist_ok=True)
+
+    names = ["input_ids", "attention_mask", "token_type_ids"]
+    sample = tokenizer(["An example sentence."], return_tensors="pt")
+    fp32_path = os.path.join(out_dir, "model.onnx")
+    torch.onnx.export(
+        model, tuple(sample[n] for n in names), fp32_path,
+        input_names=names, output_names=["last_hidden_state"],
+        dynamic_axes={n: {0: "batch", 1: "sequence"} for n in names + ["last_hidden_state"]},
+        opset_version=14
+    )
+    quantize_dynamic(fp32_path, os.path.join(out_dir, "model_quantized.onnx"), weight_type=QuantType.QInt8)
+    tokenizer.save_pretrained(out_dir)  # writes tokenizer.json
+    return out_dir
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Build a local int8 ONNX embedding model.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    export = sub.add_parser("export")
+    export.add_argument("--model", default=EMBEDDING_MODEL)
+    export.add_argument("--out", default="models/minilm-int8")
+    args = parser.parse_args(argv)
+    print(f"Wrote {export_onnx_int8(args.model, args.out)}")
+
+
+if __name__ == "__main__":
+    main()
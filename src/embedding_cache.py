@@ -0,0 +1,153 @@
+import os
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from src.storage import cache_path, sha256_text, slugify
+
+DEFAULT_MAX_ENTRIES = int(os.getenv("CAREERFORGE_EMBED_CACHE_ENTRIES", "20000"))
+
+
+class EmbeddingCache:
+    """
+    Content-addressed, on-disk embedding cache.
+
+    Vectors live in a fixed-size memory-mapped float32 file (one row per slot);
+    a small SQLite index maps sha256(model, kind, text) -> slot and tracks
+    last use for LRU eviction. SQLite's file lock makes it safe to share the
+    same cache between Streamlit sessions and separate processes.
+    """
+
+    def __init__(self, model_name, max_entries=DEFAULT_MAX_ENTRIES):
+        self.model_name = model_name
+        self.max_entries = max_entries
+        self.vectors_path = cache_path("embeddings", slugify(model_name), "vectors.f32")
+        self.index_path = cache_path("embeddings", slugify(model_name), "index.sqlite")
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._vectors = None
+        self._db = sqlite3.connect(self.index_path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.executescript("""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, slot INTEGER NOT NULL, last_used REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS entries_lru ON entries (last_used);
+            CREATE TABLE IF NOT EXISTS meta (name TEXT PRIMARY KEY, value INTEGER NOT NULL);
+        """)
+
+    def _key(self, kind, text):
+        return sha256_text(f"{self.model_name}\0{kind}\0{text}")
+
+    def _meta(self, name):
+        row = self._db.execute("SELECT value FROM meta WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def _bump(self, name, amount):
+        if amount:
+            self._db.execute(
+                "INSERT INTO meta (name, value) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+                (name, amount),
+            )
+
+    def _open_vectors(self, dim=None):
+        """Maps the vector file, creating it on first write. Must hold the DB write lock."""
+        if self._vectors is not None:
+            return self._vectors
+        stored_dim = self._meta("dim")
+        if stored_dim is None:
+            if dim is None:
+                return None
+            capacity = self.max_entries
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="w+", shape=(capacity, dim))
+            self._db.execute("INSERT INTO meta (name, value) VALUES ('dim', ?), ('capacity', ?)", (dim, capacity))
+        else:
+            # The first process to create the file fixes its capacity.
+            capacity = self._meta("capacity")
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r+", shape=(capacity, stored_dim))
+        return self._vectors
+
+    def get_many(self, kind, texts):
+        """Returns {index: vector} for the texts that are cached."""
+        keys = [self._key(kind, t) for t in texts]
+        found = {}
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                vectors = self._open_vectors()
+                if vectors is not None:
+                    now = time.time()
+                    for i, key in enumerate(keys):
+                        row = self._db.execute("SELECT slot FROM entries WHERE key = ?", (key,)).fetchone()
+                        if row:
+                            found[i] = np.array(vectors[row[0]])
+                            self._db.execute("UPDATE entries SET last_used = ? WHERE key = ?", (now, key))
+                self._bump("hits", len(found))
+                self._bump("misses", len(keys) - len(found))
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self.hits += len(found)
+            self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, kind, texts, vectors):
+        """Stores vectors, evicting the least recently used entries when full."""
+        if not texts:
+            return
+        vectors = np.asarray(vectors, dtype=np.float32)
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                store = self._open_vectors(vectors.shape[1])
+                capacity = store.shape[0]
+                now = time.time()
+                count = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                for text, vector in zip(texts[-capacity:], vectors[-capacity:]):
+                    key = self._key(kind, text)
+                    row = self._db.execute("SELECT slot FROM entries WHERE key = ?", (key,)).fetchone()
+                    if row:
+                        slot = row[0]
+                    else:
+                        if count < capacity:
+                            slot = count
+                            count += 1
+                        else:
+                            old_key, slot = self._db.execute(
+                                "SELECT key, slot FROM entries ORDER BY last_used LIMIT 1"
+                            ).fetchone()
+                            self._db.execute("DELETE FROM entries WHERE key = ?", (old_key,))
+                            self._bump("evictions", 1)
+                    store[slot] = vector
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO entries (key, slot, last_used) VALUES (?, ?, ?)", (key, slot, now)
+                    )
+                store.flush()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+
+    def stats(self):
+        """Hit/miss counters for this process plus lifetime totals for the shared cache."""
+        with self._lock:
+            entries = self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "total_hits": self._meta("hits") or 0,
+                "total_misses": self._meta("misses") or 0,
+                "evictions": self._meta("evictions") or 0,
+                "entries": entries,
+                "capacity": self._meta("capacity") or self.max_entries,
+            }
+
+
+@lru_cache(maxsize=None)
+def get_embedding_cache(model_name):
+    """One cache handle per model, shared by every CareerAI in the process."""
+    return EmbeddingCache(model_name)
@@ -0,0 +1,15 @@
+"""
+Which embedding model/backend the app uses and how derived data is namespaced.
+Kept free of LangChain and model imports so the landing page can read it for free.
+"""
+import os
+
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+DEFAULT_BACKEND = "sentence-transformers"
+EMBEDDING_BACKEND = os.getenv("CAREERFORGE_EMBEDDING_BACKEND", DEFAULT_BACKEND)
+
+
+def embedding_key(model_name, backend=DEFAULT_BACKEND):
+    """Namespace for anything derived from vectors; backends never share cached vectors."""
+    return model_name if backend == DEFAULT_BACKEND else f"{model_name}+{backend}"
@@ -0,0 +1,75 @@
+"""
+LangChain-facing embedding models: the process-wide registry of lazily loaded,
+disk-cached models. Imports LangChain, so only feature code should import it.
+"""
+import threading
+from functools import lru_cache
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from src.embedding_backends import load_backend
+from src.embedding_cache import get_embedding_cache
+from src.embedding_config import DEFAULT_BACKEND, embedding_key
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain Embeddings wrapper that only sends cache misses to the wrapped model."""
+
+    def __init__(self, embeddings, cache):
+        self.embeddings = embeddings
+        self.cache = cache
+
+    def _embed(self, kind, texts, compute):
+        found = self.cache.get_many(kind, texts)
+        missing = [i for i in range(len(texts)) if i not in found]
+        if missing:
+            computed = compute([texts[i] for i in missing])
+            self.cache.put_many(kind, [texts[i] for i in missing], computed)
+            found.update(zip(missing, np.asarray(computed, dtype=np.float32)))
+        return [found[i].tolist() for i in range(len(texts))]
+
+    def embed_documents(self, texts):
+        return self._embed("doc", list(texts), self.embeddings.embed_documents)
+
+    def embed_query(self, text):
+        return self._embed("query", [text], lambda t: [self.embeddings.embed_query(t[0])])[0]
+
+
+class LazyEmbeddings(Embeddings):
+    """Builds the wrapped model (and loads its weights) on the first embed call, once."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._model is not None
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    self._model = self._factory()
+        return self._model
+
+    def embed_documents(self, texts):
+        return self.model.embed_documents(texts)
+
+    def embed_query(self, text):
+        return self.model.embed_query(text)
+
+
+@lru_cache(maxsize=None)
+def get_embeddings(model_name, backend=DEFAULT_BACKEND):
+    """
+    Process-wide embedding model registry: one lazily loaded, cache-backed model per
+    (name, backend), independent of LLM model/temperature, so agents can be rebuilt for free.
+    """
+    return CachedEmbeddings(
+        LazyEmbeddings(lambda: load_backend(backend, model_name)),
+        get_embedding_cache(embedding_key(model_name, backend))
+    )
@@ -0,0 +1,51 @@
+import re
+from functools import lru_cache
+
+from src.storage import LRUCache, sha256_text
+
+MATCH_LABEL = "MATCH"
+MATCH_COLOR = "#ff00ff"
+
+# Annotated output per (resume hash, keyword set); reruns with unchanged inputs are a dict hit.
+_ANNOTATIONS = LRUCache(max_entries=128)
+
+
+@lru_cache(maxsize=64)
+def _compile(keywords):
+    """One alternation per keyword set, longest first so multi-word terms win over their prefixes."""
+    return re.compile(
+        r"(?<!\w)(?:" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r")(?!\w)",
+        re.IGNORECASE
+    )
+
+
+def keyword_spans(text, keywords):
+    """(start, end, keyword) offsets of every keyword hit, found in a single regex scan."""
+    lowered = frozenset(k.strip().lower() for k in keywords if k and k.strip())
+    if not lowered or not text:
+        return []
+    pattern = _compile(lowered)
+    return [(m.start(), m.end(), m.group(0).lower()) for m in pattern.finditer(text) if m.group(0).lower() in lowered]
+
+
+def spans_to_parts(text, spans, label=MATCH_LABEL, color=MATCH_COLOR):
+    """Turns sorted, non-overlapping (start, end, ...) spans into annotated_text parts."""
+    parts, last = [], 0
+    for start, end, *_ in spans:
+        if start > last:
+            parts.append(text[last:start])
+        parts.append((text[start:end], label, color))
+        last = end
+    if last < len(text):
+        parts.append(text[last:])
+    return parts
+
+
+def annotate(text, keywords):
+    """Memoised annotated_text parts highlighting keywords in text."""
+    key = (sha256_text(text or ""), frozenset(k.strip().lower() for k in keywords if k and k.strip()))
+    parts = _ANNOTATIONS.get(key)
+    if parts is None:
+        parts = spans_to_parts(text, keyword_spans(text, keywords))
+        _ANNOTATIONS.put(key, parts)
+    return parts
@@ -0,0 +1,55 @@
+import json
+import os
+import shutil
+import tempfile
+
+import faiss
+import numpy as np
+
+from src.storage import cache_path
+
+# Newer FAISS builds can mmap flat indexes directly; older ones only honour IO_FLAG_MMAP.
+_MMAP_FLAGS = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP) | faiss.IO_FLAG_READ_ONLY
+
+
+def _kb_dir(key):
+    return cache_path("kb", key)
+
+
+def load_knowledge_base(key):
+    """
+    Returns (chunk_texts, chunk_matrix, faiss_index) for a stored resume, or None.
+    The index and the matrix are memory-mapped read-only, so warm loads are cheap and
+    every session reading the same resume shares the same page-cache pages.
+    """
+    path = _kb_dir(key)
+    if not os.path.exists(os.path.join(path, "chunks.json")):
+        return None
+    try:
+        with open(os.path.join(path, "chunks.json"), encoding="utf-8") as f:
+            texts = json.load(f)
+        matrix = np.load(os.path.join(path, "matrix.npy"), mmap_mode="r")
+        index = faiss.read_index(os.path.join(path, "index.faiss"), _MMAP_FLAGS)
+    except (OSError, ValueError, RuntimeError):
+        # Half-written or corrupt entry: treat as a miss and let the caller rebuild it.
+        shutil.rmtree(path, ignore_errors=True)
+        return None
+    return texts, matrix, index
+
+
+def save_knowledge_base(key, texts, matrix, index):
+    """Writes the entry to a temp dir and renames it into place so readers never see partial files."""
+    path = _kb_dir(key)
+    # Unique per write: sessions are threads of one process and may build the same resume at once.
+    tmp_path = tempfile.mkdtemp(prefix=os.path.basename(path) + ".tmp-", dir=os.path.dirname(path))
+    try:
+        with open(os.path.join(tmp_path, "chunks.json"), "w", encoding="utf-8") as f:
+            json.dump(texts, f)
+        np.save(os.path.join(tmp_path, "matrix.npy"), np.ascontiguousarray(matrix, dtype=np.float32))
+        faiss.write_index(index, os.path.join(tmp_path, "index.faiss"))
+        try:
+            os.rename(tmp_path, path)
+        except OSError:
+            pass  # another session or process stored the same resume first; theirs is identical
+    finally:
+        shutil.rmtree(tmp_path, ignore_errors=True)
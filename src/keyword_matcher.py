@@ -0,0 +1,122 @@
+import os
+from collections import deque
+from functools import lru_cache
+
+VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), "skills.txt")
+
+
+def _fold(text):
+    """Lower-cases without changing length, so spans on the folded text map 1:1 to the original."""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+def load_vocabulary(path=VOCABULARY_PATH):
+    """Parses skills.txt into {surface form: (canonical, case_sensitive)}."""
+    vocabulary = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            terms = [t.strip() for t in line.split("|") if t.strip()]
+            canonical = terms[0].lstrip("=")
+            for term in terms:
+                vocabulary[term.lstrip("=")] = (canonical, term.startswith("="))
+    return vocabulary
+
+
+class SkillMatcher:
+    """
+    Aho-Corasick automaton over a skill vocabulary. One linear pass over a text
+    returns every (start, end, canonical) span, matched case-insensitively on word
+    boundaries with aliases mapped to their canonical skill. Overlapping hits are
+    resolved leftmost-longest, so "Spring Boot" wins over "Spring".
+    """
+
+    def __init__(self, vocabulary):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [[]]  # per state: (pattern length, surface, canonical, case_sensitive)
+        for surface, (canonical, case_sensitive) in vocabulary.items():
+            self._insert(surface, canonical, case_sensitive)
+        self._build_failure_links()
+
+    def _insert(self, surface, canonical, case_sensitive):
+        state = 0
+        for char in _fold(surface):
+            nxt = self._goto[state].get(char)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][char] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append((len(surface), surface, canonical, case_sensitive))
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(char, 0)
+                self._fail[nxt] = candidate if candidate != nxt else 0
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+    def find(self, text):
+        """Returns non-overlapping (start, end, canonical) spans in text order."""
+        folded = _fold(text)
+        hits = []
+        state = 0
+        for i, char in enumerate(folded):
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            for length, surface, canonical, case_sensitive in self._out[state]:
+                start, end = i + 1 - length, i + 1
+                # Only enforce a word boundary where the term itself starts/ends with a word char.
+                if surface[0].isalnum() and start > 0 and text[start - 1].isalnum():
+                    continue
+                if surface[-1].isalnum() and end < len(text) and text[end].isalnum():
+                    continue
+                if case_sensitive and text[start:end] != surface:
+                    continue
+                hits.append((start, end, canonical))
+
+        spans, last_end = [], 0
+        for start, end, canonical in sorted(hits, key=lambda h: (h[0], h[0] - h[1])):
+            if start >= last_end:
+                spans.append((start, end, canonical))
+                last_end = end
+        return spans
+
+    def match(self, resume_text, job_desc):
+        """
+        Compares both texts: "matched" are JD skills also in the resume (JD order),
+        "missing" are JD skills the resume lacks; spans are returned for highlighting.
+        """
+        resume_spans = self.find(resume_text or "")
+        jd_spans = self.find(job_desc or "")
+        in_resume = {canonical for _, _, canonical in resume_spans}
+        jd_skills = list(dict.fromkeys(canonical for _, _, canonical in jd_spans))
+        matched = [s for s in jd_skills if s in in_resume]
+        matched_set = set(matched)
+        return {
+            "matched": matched,
+            "missing": [s for s in jd_skills if s not in in_resume],
+            "resume_spans": [span for span in resume_spans if span[2] in matched_set],
+            "jd_spans": jd_spans,
+        }
+
+
+@lru_cache(maxsize=None)
+def get_skill_matcher(path=VOCABULARY_PATH):
+    """The compiled default vocabulary, built once per process."""
+    return SkillMatcher(load_vocabulary(path))
@@ -0,0 +1,90 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from functools import lru_cache
+
+from src.storage import LRUCache, cache_path, sha256_text
+
+DEFAULT_TTL = float(os.getenv("CAREERFORGE_LLM_CACHE_TTL", str(7 * 24 * 3600)))
+CACHE_ENABLED = os.getenv("CAREERFORGE_LLM_CACHE", "1") != "0"
+
+
+def _normalize(value):
+    """Whitespace-insensitive view of prompt inputs so trivially different pastes share a key."""
+    if isinstance(value, str):
+        return re.sub(r"\s+", " ", value).strip()
+    if isinstance(value, (list, tuple)):
+        return [_normalize(v) for v in value]
+    if isinstance(value, dict):
+        return {k: _normalize(v) for k, v in value.items()}
+    return value
+
+
+def make_key(method, model, temperature, template, inputs):
+    payload = json.dumps(
+        [method, model, temperature, _normalize(template), _normalize(inputs)], sort_keys=True, default=str
+    )
+    return sha256_text(payload)
+
+
+class ResponseCache:
+    """
+    Two-tier cache for deterministic LLM responses: an in-memory LRU in front of a
+    SQLite table shared by every session and process. Entries expire after their TTL.
+    """
+
+    def __init__(self, path=None, max_memory_entries=512):
+        self.memory = LRUCache(max_memory_entries)
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path or cache_path("llm_responses.sqlite"), timeout=30, check_same_thread=False)
+        with self._lock:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)"
+            )
+            self._db.commit()
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None:
+            with self._lock:
+                row = self._db.execute("SELECT value, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row and row[1] > time.time():
+                value = row[0]
+                self.memory.put(key, value, ttl=row[1] - time.time())
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def put(self, key, value, ttl=None):
+        ttl = ttl or DEFAULT_TTL
+        self.memory.put(key, value, ttl=ttl)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, expires) VALUES (?, ?, ?)", (key, value, time.time() + ttl)
+            )
+            self._db.commit()
+
+    def purge_expired(self):
+        with self._lock:
+            self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+            self._db.commit()
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses, "memory_entries": len(self.memory)}
+
+
+@lru_cache(maxsize=None)
+def get_response_cache():
+    """Process-wide cache handle; expired rows are purged once per process."""
+    cache = ResponseCache()
+    cache.purge_expired()
+    return cache
@@ -1,41 +1,437 @@
+import asyncio
+import json
 import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 import numpy as np
 from langchain_core.prompts import PromptTemplate
-from langchain_core.documents import Document
-from langchain_groq import ChatGroq
-from langchain_huggingface import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
-from groq import Groq # Direct client for Audio
+import faiss
+from src.audio_client import AUDIO_CONNECTIONS, get_audio_client
+from src.audio_prep import prepare_segments
+from src.embedding_config import DEFAULT_BACKEND, EMBEDDING_BACKEND, EMBEDDING_MODEL, embedding_key
+from src.embeddings import get_embeddings
+from src.llm_cache import CACHE_ENABLED, get_response_cache, make_key
+from src.rate_limiter import get_rate_limiter
+from src.kb_store import load_knowledge_base, save_knowledge_base
+from src.storage import cache_path, sha256_text, slugify
+from src.chunker import iter_chunks, iter_fixed_chunks
+from src.pdf_handler import extract_text_cached
+from src.token_budget import TokenUsage, count_tokens, fit_to_budget, get_budgets, session_usage
+
+# Bump whenever a chunker's output changes so stored knowledge bases are rebuilt.
+CHUNKING_VERSION = 2
+# Company facts go stale faster than resume/JD analysis.
+COMPANY_INSIGHT_TTL = 24 * 3600
+# Output tokens held against the TPM bucket until a call reports its real usage.
+COMPLETION_RESERVE = 512
+# Retrieval mode: JD requirements are split into units of at most this many tokens.
+REQUIREMENT_MAX_TOKENS = 40
+
+
+def _normalize_rows(matrix):
+    """L2-normalises each row; all-zero rows are left untouched."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+
+def _top_k_mean(scores, k):
+    """Mean of the k largest scores, using argpartition instead of a full sort."""
+    if len(scores) > k:
+        scores = scores[np.argpartition(scores, -k)[-k:]]
+    return float(np.mean(scores))
+
+
+PROFILE_INSIGHTS_SCHEMA = {
+    "title": "profile_insights",
+    "description": "Skill gap and ATS keyword comparison of a resume against a job description.",
+    "type": "object",
+    "properties": {
+        "present_skills": {"type": "array", "items": {"type": "string"}},
+        "missing_skills": {"type": "array", "items": {"type": "string"}},
+        "matched_keywords": {"type": "array", "items": {"type": "string"}},
+        "score": {"type": "integer", "minimum": 0, "maximum": 100}
+    },
+    "required": ["present_skills", "missing_skills", "matched_keywords", "score"]
+}
+
+
+def _check_parsed(method, result, schema):
+    """
+    Raises when a structured call produced nothing usable (no tool call, or arguments that
+    failed to parse), so a null result is neither returned as data nor cached for the TTL.
+    """
+    if schema and (result["parsed"] is None or result.get("parsing_error")):
+        raise ValueError(f"{method}: no structured output ({result.get('parsing_error') or 'no tool call'})")
+
+
+def _clean_insights(raw):
+    """Fills in anything the model left out so callers can index the dict directly."""
+    raw = raw or {}
+    return {
+        "present_skills": [s for s in raw.get("present_skills") or [] if s],
+        "missing_skills": [s for s in raw.get("missing_skills") or [] if s],
+        "matched_keywords": [k for k in raw.get("matched_keywords") or [] if k],
+        "score": max(0, min(100, int(raw.get("score") or 0)))
+    }
+
+
+class MeteredStream:
+    """
+    Iterator over a streamed response's tokens. `metrics` holds this call's ttft/total/cached
+    once the stream is exhausted; the agent is shared across sessions, so its call_metrics
+    log may already end with someone else's call.
+    """
+
+    def __init__(self):
+        self.tokens = None
+        self.metrics = None
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self.tokens)
+
+
+class AsyncMeteredStream:
+    """Async counterpart of MeteredStream."""
+
+    def __init__(self):
+        self.tokens = None
+        self.metrics = None
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        return await self.tokens.__anext__()
+
+
+@dataclass
+class AnalysisResult:
+    resume_text: str
+    match_score: int
+    analysis: str
+    company_context: str
+    insights: dict = None  # see PROFILE_INSIGHTS_SCHEMA
+    timings: dict = field(default_factory=dict)  # seconds per pipeline step
+    pages_skipped: int = 0  # PDF pages past the extraction limit, not analysed
+
 
 class CareerAI:
-    def __init__(self, model_name="llama-3.3-70b-versatile", temperature=0.0):
+    def __init__(self, model_name="llama-3.3-70b-versatile", temperature=0.0, chunker="section",
+                 cache_responses=CACHE_ENABLED, budgets=None, retrieval_k=0, embedding_backend=EMBEDDING_BACKEND):
         self.api_key = os.getenv("GROQ_API_KEY")
-        self.llm = ChatGroq(
-            temperature=temperature,
-            model_name=model_name,
-            api_key=self.api_key
-        )
-        self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
+        self.model_name = model_name
+        self.temperature = temperature
+        self._llm = None
+        # Shared by every agent in the process; weights load on the first embed call.
+        self.embedding_backend = embedding_backend
+        self.embeddings = get_embeddings(EMBEDDING_MODEL, embedding_backend)
         self.vector_db = None
+        self.chunk_matrix = None
+        self.chunk_texts = []
+        self.chunker = chunker
+        self.kb_key = None
+        # >0: prompts get only the top-k resume chunks per JD requirement instead of the full text.
+        self.retrieval_k = retrieval_k
+        # Responses are only cached at temperature 0; anything creative always hits the API.
+        self.cache_responses = cache_responses
+        self.response_cache = get_response_cache()
+        # Latency of recent LLM calls across all sessions: time-to-first-token and total seconds.
+        self.call_metrics = deque(maxlen=100)
+        # Per-method input token budgets and cumulative token/cost accounting.
+        self.budgets = get_budgets(budgets)
+        self.usage = TokenUsage()
+        # Process-wide quotas: every agent and session shares the same buckets.
+        self.limiter = get_rate_limiter("chat")
 
-    def create_knowledge_base(self, resume_text):
-        if not resume_text: return
-        chunks = [Document(page_content=chunk) for chunk in self._chunk_text(resume_text)]
-        self.vector_db = FAISS.from_documents(chunks, self.embeddings)
+    @property
+    def llm(self):
+        # Built on first use so embedding-only callers (e.g. bulk screening) need no API key.
+        if self._llm is None:
+            from langchain_groq import ChatGroq
+            self._llm = ChatGroq(
+                temperature=self.temperature,
+                model_name=self.model_name,
+                api_key=self.api_key,
+                max_retries=0  # retries and backoff are owned by the shared limiter
+            )
+        return self._llm
 
-    def _chunk_text(self, text, size=500):
-        return [text[i:i+size] for i in range(0, len(text), size)]
+    # --- LLM CALLS ---
+    def _cache_key(self, method, prompt, inputs):
+        """Response-cache key, or None when the call is non-deterministic or caching is off."""
+        if not self.cache_responses or self.temperature > 0:
+            return None
+        template = prompt if isinstance(prompt, str) else prompt.template
+        return make_key(method, self.model_name, self.temperature, template, inputs)
 
-    def calculate_similarity(self, job_desc):
-        if not self.vector_db: return 0
-        jd_embedding = self.embeddings.embed_query(job_desc)
-        docs = self.vector_db.similarity_search(job_desc, k=5)
-        if not docs: return 0
-        doc_embeddings = [self.embeddings.embed_query(d.page_content) for d in docs]
-        scores = [np.dot(jd_embedding, de) for de in doc_embeddings]
-        return int(np.mean(scores) * 100)
+    def _runnable(self, prompt, schema=None):
+        # include_raw keeps the AIMessage around so structured calls still report token usage.
+        llm = self.llm.with_structured_output(schema, include_raw=True) if schema else self.llm
+        return llm if isinstance(prompt, str) else prompt | llm
 
-    def analyze_profile(self, resume_text, job_desc, persona="HR Recruiter"):
+    def _fit_inputs(self, method, inputs):
+        """Applies the method's per-input token budgets, truncating on sentence/bullet boundaries."""
+        limits = self.budgets.get(method)
+        if not inputs or not limits:
+            return inputs
+        return {
+            name: fit_to_budget(value, limits[name]) if name in limits and isinstance(value, str) else value
+            for name, value in inputs.items()
+        }
+
+    def _prompt_text(self, prompt, inputs):
+        return prompt if isinstance(prompt, str) else prompt.format(**inputs)
+
+    def _reserve_tokens(self, prompt, inputs):
+        """Estimated prompt tokens plus an output allowance, for the limiter's TPM bucket."""
+        return count_tokens(self._prompt_text(prompt, inputs)) + COMPLETION_RESERVE
+
+    def _account(self, method, prompt, inputs, message, completion):
+        """Adds a call's tokens to the agent's and the current session's usage; returns the total."""
+        usage = getattr(message, "usage_metadata", None)
+        if usage:
+            prompt_tokens, completion_tokens = usage["input_tokens"], usage["output_tokens"]
+        else:
+            prompt_tokens, completion_tokens = count_tokens(self._prompt_text(prompt, inputs)), count_tokens(completion)
+        for tracker in (self.usage, session_usage()):
+            if tracker is not None:
+                tracker.record(method, self.model_name, prompt_tokens, completion_tokens, estimated=not usage)
+        return prompt_tokens + completion_tokens
+
+    def _invoke(self, method, prompt, inputs=None, ttl=None, schema=None):
+        """
+        Runs a prompt through the LLM, serving repeated deterministic calls from the cache.
+        With a JSON schema the call is schema-constrained and returns a dict.
+        """
+        inputs = self._fit_inputs(method, inputs)
+        key = self._cache_key(method, prompt, inputs)
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return json.loads(cached) if schema else cached
+        started = time.perf_counter()
+        reserved = self._reserve_tokens(prompt, inputs)
+        result = self.limiter.call(
+            self._runnable(prompt, schema).invoke, prompt if isinstance(prompt, str) else inputs, tokens=reserved
+        )
+        message, content = (result["raw"], result["parsed"]) if schema else (result, result.content)
+        self._record(method, started, None)
+        self.limiter.settle(reserved, self._account(method, prompt, inputs, message, json.dumps(content) if schema else content))
+        _check_parsed(method, result, schema)
+        if key:
+            self.response_cache.put(key, json.dumps(content) if schema else content, ttl)
+        return content
+
+    async def _ainvoke(self, method, prompt, inputs=None, ttl=None, schema=None):
+        inputs = self._fit_inputs(method, inputs)
+        key = self._cache_key(method, prompt, inputs)
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return json.loads(cached) if schema else cached
+        started = time.perf_counter()
+        reserved = self._reserve_tokens(prompt, inputs)
+        result = await self.limiter.acall(
+            self._runnable(prompt, schema).ainvoke, prompt if isinstance(prompt, str) else inputs, tokens=reserved
+        )
+        message, content = (result["raw"], result["parsed"]) if schema else (result, result.content)
+        self._record(method, started, None)
+        self.limiter.settle(reserved, self._account(method, prompt, inputs, message, json.dumps(content) if schema else content))
+        _check_parsed(method, result, schema)
+        if key:
+            self.response_cache.put(key, json.dumps(content) if schema else content, ttl)
+        return content
+
+    def _record(self, method, started, first_token_at, cached=False):
+        now = time.perf_counter()
+        metrics = {
+            "method": method,
+            "ttft": (first_token_at or now) - started,
+            "total": now - started,
+            "cached": cached
+        }
+        self.call_metrics.append(metrics)
+        return metrics
+
+    def _stream(self, method, prompt, inputs=None, ttl=None, refresh=False):
+        """
+        MeteredStream of response tokens as they arrive; cached responses are yielded whole.
+        refresh skips the cache read (an explicit "regenerate") but still stores the new response.
+        """
+        stream = MeteredStream()
+        stream.tokens = self._stream_tokens(stream, method, prompt, inputs, ttl, refresh)
+        return stream
+
+    def _stream_tokens(self, stream, method, prompt, inputs, ttl, refresh):
+        started, first_token_at = time.perf_counter(), None
+        inputs = self._fit_inputs(method, inputs)
+        key = self._cache_key(method, prompt, inputs)
+        cached = self.response_cache.get(key) if key and not refresh else None
+        if cached is not None:
+            stream.metrics = self._record(method, started, None, cached=True)
+            yield cached
+            return
+        runnable = self.llm if isinstance(prompt, str) else prompt | self.llm
+        parts, last = [], None
+        reserved = self._reserve_tokens(prompt, inputs)
+        payload = prompt if isinstance(prompt, str) else inputs
+        for chunk in self.limiter.stream(lambda: runnable.stream(payload), tokens=reserved):
+            last = chunk if getattr(chunk, "usage_metadata", None) else last
+            if not chunk.content: continue
+            first_token_at = first_token_at or time.perf_counter()
+            parts.append(chunk.content)
+            yield chunk.content
+        stream.metrics = self._record(method, started, first_token_at)
+        self.limiter.settle(reserved, self._account(method, prompt, inputs, last, "".join(parts)))
+        if key:
+            self.response_cache.put(key, "".join(parts), ttl)
+
+    def _astream(self, method, prompt, inputs=None, ttl=None, refresh=False):
+        stream = AsyncMeteredStream()
+        stream.tokens = self._astream_tokens(stream, method, prompt, inputs, ttl, refresh)
+        return stream
+
+    async def _astream_tokens(self, stream, method, prompt, inputs, ttl, refresh):
+        started, first_token_at = time.perf_counter(), None
+        inputs = self._fit_inputs(method, inputs)
+        key = self._cache_key(method, prompt, inputs)
+        cached = self.response_cache.get(key) if key and not refresh else None
+        if cached is not None:
+            stream.metrics = self._record(method, started, None, cached=True)
+            yield cached
+            return
+        runnable = self.llm if isinstance(prompt, str) else prompt | self.llm
+        parts, last = [], None
+        reserved = self._reserve_tokens(prompt, inputs)
+        payload = prompt if isinstance(prompt, str) else inputs
+        async for chunk in self.limiter.astream(lambda: runnable.astream(payload), tokens=reserved):
+            last = chunk if getattr(chunk, "usage_metadata", None) else last
+            if not chunk.content: continue
+            first_token_at = first_token_at or time.perf_counter()
+            parts.append(chunk.content)
+            yield chunk.content
+        stream.metrics = self._record(method, started, first_token_at)
+        self.limiter.settle(reserved, self._account(method, prompt, inputs, last, "".join(parts)))
+        if key:
+            self.response_cache.put(key, "".join(parts), ttl)
+
+    def _load_or_build_kb(self, resume_text, chunker):
+        """(texts, matrix, faiss index, key) from the KB store, embedding and saving on a miss."""
+        key = self._kb_key(resume_text, chunker)
+        stored = load_knowledge_base(key)
+        if stored:
+            texts, matrix, index = stored
+        else:
+            texts = self._chunk_text(resume_text, chunker)
+            # Keep the chunk embeddings as one contiguous, L2-normalised float32 matrix
+            # so scoring is a single matrix-vector product (no re-embedding of chunks).
+            matrix = _normalize_rows(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+            index = faiss.IndexFlatL2(matrix.shape[1])
+            index.add(matrix)
+            save_knowledge_base(key, texts, matrix, index)
+        return texts, matrix, index, key
+
+    def create_knowledge_base(self, resume_text, chunker=None):
+        """
+        chunker: "section" (sentence/bullet/section boundaries) or "fixed" (500-char slices).
+        Returns (chunk texts, chunk matrix). The agent is shared across sessions, so callers
+        that score or retrieve should use these rather than the instance attributes.
+        """
+        if not resume_text: return [], None
+        texts, matrix, index, key = self._load_or_build_kb(resume_text, chunker or self.chunker)
+        self.chunk_matrix = matrix
+        self.chunk_texts = texts
+        self.kb_key = key
+        from langchain_core.documents import Document
+        from langchain_community.vectorstores import FAISS
+        from langchain_community.docstore.in_memory import InMemoryDocstore
+        ids = [str(i) for i in range(len(texts))]
+        self.vector_db = FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore({i: Document(page_content=t) for i, t in zip(ids, texts)}),
+            index_to_docstore_id=dict(enumerate(ids))
+        )
+        return texts, matrix
+
+    def _kb_key(self, resume_text, chunker=None):
+        # Stored indexes are keyed by everything that shapes them: model, chunking and text.
+        model = embedding_key(EMBEDDING_MODEL, self.embedding_backend)
+        return sha256_text(f"{model}\0{chunker or self.chunker}-v{CHUNKING_VERSION}\0{resume_text}")
+
+    def _chunk_text(self, text, chunker=None):
+        if (chunker or self.chunker) == "fixed":
+            return list(iter_fixed_chunks(text))
+        return list(iter_chunks(text))
+
+    def calculate_similarity(self, job_desc, k=5, matrix=None):
+        """Scores `matrix` (default: the last knowledge base built) against the JD."""
+        matrix = self.chunk_matrix if matrix is None else matrix
+        if matrix is None or not len(matrix): return 0
+        jd_embedding = _normalize_rows(np.asarray([self.embeddings.embed_query(job_desc)], dtype=np.float32))[0]
+        return int(_top_k_mean(matrix @ jd_embedding, k) * 100)
+
+    def score_resumes(self, resume_texts, job_desc, k=5):
+        """
+        Scores many resumes against one JD, embedding all their chunks in one batched call.
+        Bulk chunks go straight to the model: they are rarely seen again and would evict every
+        interactive entry from the shared embedding cache.
+        """
+        chunked = [self._chunk_text(text) if text else [] for text in resume_texts]
+        flat = [chunk for chunks in chunked for chunk in chunks]
+        if not flat: return [0] * len(resume_texts)
+        model = getattr(self.embeddings, "embeddings", self.embeddings)  # unwrap CachedEmbeddings
+        matrix = _normalize_rows(np.asarray(model.embed_documents(flat), dtype=np.float32))
+        jd_embedding = _normalize_rows(np.asarray([self.embeddings.embed_query(job_desc)], dtype=np.float32))[0]
+        similarities = matrix @ jd_embedding
+        scores, start = [], 0
+        for chunks in chunked:
+            end = start + len(chunks)
+            scores.append(int(_top_k_mean(similarities[start:end], k) * 100) if chunks else 0)
+            start = end
+        return scores
+
+    def retrieve_context(self, resume_text, job_desc, k=None, knowledge_base=None):
+        """
+        The resume chunks that best match each JD requirement (top-k per requirement),
+        deduplicated and in resume order. knowledge_base: (texts, matrix) already built for
+        this resume; otherwise it is loaded from the KB store without touching shared state.
+        """
+        k = k or self.retrieval_k or 3
+        if knowledge_base is None:
+            knowledge_base = self._load_or_build_kb(resume_text, self.chunker)[:2]
+        texts, matrix = knowledge_base
+        requirements = list(iter_chunks(job_desc, max_tokens=REQUIREMENT_MAX_TOKENS, overlap_tokens=0, min_section_tokens=0))
+        if matrix is None or not len(texts) or not requirements:
+            return resume_text
+        k = min(k, len(texts))
+        queries = _normalize_rows(np.asarray(self.embeddings.embed_documents(requirements), dtype=np.float32))
+        top = np.argpartition(-(queries @ matrix.T), k - 1, axis=1)[:, :k]
+        return "\n".join(texts[i] for i in np.unique(top))
+
+    def _resume_context(self, resume_text, job_desc, knowledge_base=None):
+        """Prompt-ready resume: retrieved chunks in retrieval mode, the full text otherwise."""
+        if not self.retrieval_k or not resume_text or not job_desc:
+            return resume_text
+        return self.retrieve_context(resume_text, job_desc, knowledge_base=knowledge_base)
+
+    def open_talent_pool(self, path=None, nprobe=16):
+        """Corpus-wide candidate search sharing this agent's embeddings and chunking."""
+        from src.talent_pool import TalentPool
+        if path is None and self.embedding_backend != DEFAULT_BACKEND:
+            # A pool's vectors are only comparable with queries from the same backend.
+            path = cache_path("talent_pool", slugify(embedding_key(EMBEDDING_MODEL, self.embedding_backend)), "pool.faiss")
+        pool = TalentPool(self.embeddings, self._chunk_text, path=path, nprobe=nprobe)
+        pool.load()
+        return pool
+
+    def _analysis_prompt(self, persona):
         persona_prompts = {
             "HR Recruiter": "Focus on culture fit, soft skills, and red flags.",
             "Senior Engineer": "Focus strictly on technical depth, stack alignment, and complexity.",
@@ -43,7 +439,7 @@ class CareerAI:
         }
         instructions = persona_prompts.get(persona, "General analysis.")
         
-        prompt = PromptTemplate(
+        return PromptTemplate(
             input_variables=["resume", "job_desc"],
             template=f"""
             Role: {persona}. Instructions: {instructions}
@@ -52,7 +448,34 @@ class CareerAI:
             Task: detailed analysis, missing skills, score (0-100%). Output Markdown.
             """
         )
-        return (prompt | self.llm).invoke({"resume": resume_text, "job_desc": job_desc}).content
+
+    def analyze_profile(self, resume_text, job_desc, persona="HR Recruiter"):
+        prompt = self._analysis_prompt(persona)
+        resume = self._resume_context(resume_text, job_desc)
+        return self._invoke("analyze_profile", prompt, {"resume": resume, "job_desc": job_desc})
+
+    async def aanalyze_profile(self, resume_text, job_desc, persona="HR Recruiter", knowledge_base=None, on_token=None):
+        """on_token, if given, is called with each token as it streams in; the full text is still returned."""
+        prompt = self._analysis_prompt(persona)
+        resume = await asyncio.to_thread(self._resume_context, resume_text, job_desc, knowledge_base)
+        inputs = {"resume": resume, "job_desc": job_desc}
+        if on_token is None:
+            return await self._ainvoke("analyze_profile", prompt, inputs)
+        parts = []
+        async for token in self._astream("analyze_profile", prompt, inputs):
+            parts.append(token)
+            on_token(token)
+        return "".join(parts)
+
+    def stream_analyze_profile(self, resume_text, job_desc, persona="HR Recruiter", refresh=False):
+        prompt = self._analysis_prompt(persona)
+        resume = self._resume_context(resume_text, job_desc)
+        return self._stream("analyze_profile", prompt, {"resume": resume, "job_desc": job_desc}, refresh=refresh)
+
+    def astream_analyze_profile(self, resume_text, job_desc, persona="HR Recruiter"):
+        prompt = self._analysis_prompt(persona)
+        resume = self._resume_context(resume_text, job_desc)
+        return self._astream("analyze_profile", prompt, {"resume": resume, "job_desc": job_desc})
 
     def extract_skills_json(self, resume_text, job_desc):
         prompt = PromptTemplate(
@@ -64,43 +487,100 @@ class CareerAI:
             JD: {job_desc}
             """
         )
-        res = (prompt | self.llm).invoke({"resume": resume_text, "job_desc": job_desc}).content
+        res = self._invoke("extract_skills_json", prompt, {"resume": resume_text, "job_desc": job_desc})
         return res.replace("```json", "").replace("```", "").strip()
 
-    def generate_cover_letter(self, resume_text, job_desc):
-        prompt = PromptTemplate(
+    def _insights_prompt(self):
+        return PromptTemplate(
+            input_variables=["resume", "job_desc"],
+            template="""
+            Compare the resume against the job description and fill in every field:
+            present_skills: JD skills the resume demonstrates.
+            missing_skills: JD skills the resume lacks.
+            matched_keywords: up to 15 technical keywords from the JD that also appear in the resume, spelled as in the resume.
+            score: overall fit from 0 to 100.
+            Resume: {resume}
+            JD: {job_desc}
+            """
+        )
+
+    def extract_profile_insights(self, resume_text, job_desc):
+        """Skills, matched keywords and a fit score from one schema-constrained call."""
+        return _clean_insights(self._invoke(
+            "extract_profile_insights", self._insights_prompt(),
+            {"resume": resume_text, "job_desc": job_desc}, schema=PROFILE_INSIGHTS_SCHEMA
+        ))
+
+    async def aextract_profile_insights(self, resume_text, job_desc):
+        return _clean_insights(await self._ainvoke(
+            "extract_profile_insights", self._insights_prompt(),
+            {"resume": resume_text, "job_desc": job_desc}, schema=PROFILE_INSIGHTS_SCHEMA
+        ))
+
+    def _cover_letter_prompt(self):
+        return PromptTemplate(
             input_variables=["resume", "job_desc"],
             template="Write a professional cover letter. Resume: {resume}. JD: {job_desc}"
         )
-        return (prompt | self.llm).invoke({"resume": resume_text, "job_desc": job_desc}).content
+
+    def generate_cover_letter(self, resume_text, job_desc):
+        prompt = self._cover_letter_prompt()
+        resume = self._resume_context(resume_text, job_desc)
+        return self._invoke("generate_cover_letter", prompt, {"resume": resume, "job_desc": job_desc})
+
+    def stream_cover_letter(self, resume_text, job_desc):
+        prompt = self._cover_letter_prompt()
+        resume = self._resume_context(resume_text, job_desc)
+        return self._stream("generate_cover_letter", prompt, {"resume": resume, "job_desc": job_desc})
+
+    def astream_cover_letter(self, resume_text, job_desc):
+        prompt = self._cover_letter_prompt()
+        resume = self._resume_context(resume_text, job_desc)
+        return self._astream("generate_cover_letter", prompt, {"resume": resume, "job_desc": job_desc})
 
     # --- INTERVIEW FEATURES ---
-    def generate_interview_question(self, job_desc, missing_skills):
+    def generate_interview_question(self, job_desc, missing_skills, resume_text=None):
+        """In retrieval mode, with resume_text, the question is anchored to the candidate's relevant experience."""
+        if self.retrieval_k and resume_text:
+            prompt = PromptTemplate(
+                input_variables=["job_desc", "missing_skills", "resume"],
+                template="Ask ONE hard technical interview question based on these missing skills: {missing_skills}. "
+                         "Job: {job_desc}. Tie it to the candidate's relevant experience: {resume}."
+            )
+            return self._invoke("generate_interview_question", prompt, {
+                "job_desc": job_desc, "missing_skills": missing_skills,
+                "resume": self._resume_context(resume_text, job_desc)
+            })
         prompt = PromptTemplate(
             input_variables=["job_desc", "missing_skills"],
             template="Ask ONE hard technical interview question based on these missing skills: {missing_skills}. Job: {job_desc}."
         )
-        return (prompt | self.llm).invoke({"job_desc": job_desc, "missing_skills": missing_skills}).content
+        return self._invoke("generate_interview_question", prompt, {"job_desc": job_desc, "missing_skills": missing_skills})
 
     def evaluate_interview_answer(self, question, user_answer):
         prompt = PromptTemplate(
             input_variables=["question", "user_answer"],
             template="Grade this answer (0-10) and explain why. Question: {question}. Answer: {user_answer}."
         )
-        return (prompt | self.llm).invoke({"question": question, "user_answer": user_answer}).content
-
-    def transcribe_audio(self, audio_bytes):
-        client = Groq(api_key=self.api_key)
-        # Write temp file for the API
-        with open("temp_audio.wav", "wb") as f:
-            f.write(audio_bytes)
-        with open("temp_audio.wav", "rb") as file:
-            transcription = client.audio.transcriptions.create(
-                file=("temp_audio.wav", file.read()),
-                model="whisper-large-v3",
-                response_format="json"
-            )
-        return transcription.text
+        return self._invoke("evaluate_interview_answer", prompt, {"question": question, "user_answer": user_answer})
+
+    def transcribe_audio(self, audio_bytes, filename="answer.wav"):
+        """
+        Whisper transcription over the shared, pooled audio client. The recording is trimmed
+        and re-encoded as 16 kHz mono; long answers are split at pauses, the segments
+        transcribed in parallel and stitched back in order.
+        """
+        started = time.perf_counter()
+        client = get_audio_client(self.api_key)
+        segments = prepare_segments(audio_bytes)
+        if len(segments) <= 1:
+            text = client.transcribe(segments[0], filename) if segments else ""
+        else:
+            with ThreadPoolExecutor(max_workers=min(len(segments), AUDIO_CONNECTIONS)) as pool:
+                texts = list(pool.map(client.transcribe, segments))
+            text = " ".join(t.strip() for t in texts if t and t.strip())
+        self._record("transcribe_audio", started, None)
+        return text
     
     def extract_matched_keywords(self, resume_text, job_desc):
         """Finds keywords present in BOTH the resume and JD for highlighting."""
@@ -115,7 +595,7 @@ class CareerAI:
             JD: {job_desc}
             """
         )
-        res = (prompt | self.llm).invoke({"resume": resume_text, "job_desc": job_desc}).content
+        res = self._invoke("extract_matched_keywords", prompt, {"resume": resume_text, "job_desc": job_desc})
         # Clean list
         return [k.strip() for k in res.split(",") if k.strip()]
     
@@ -135,16 +615,15 @@ class CareerAI:
             Tone: Professional, concise, not desperate. Mention one specific alignment with their company news if relevant.
             """
         )
-        return (prompt | self.llm).invoke({
-            "resume": resume_text[:1000], 
-            "job_desc": job_desc[:500], 
+        return self._invoke("generate_cold_email", prompt, {
+            "resume": resume_text,
+            "job_desc": job_desc,
             "company_info": company_info,
             "recipient": recipient
-        }).content
+        })
     
-    def generate_company_insight(self, company_name):
-        """Generates company insights using LLM internal training data (Fallback)."""
-        prompt = PromptTemplate(
+    def _company_insight_prompt(self):
+        return PromptTemplate(
             input_variables=["company_name"],
             template="""
             You are a business intelligence analyst. 
@@ -159,8 +638,79 @@ class CareerAI:
             Disclaimer: State that this is based on internal knowledge.
             """
         )
-        return (prompt | self.llm).invoke({"company_name": company_name}).content
-    
+
+    def generate_company_insight(self, company_name):
+        """Generates company insights using LLM internal training data (Fallback)."""
+        prompt = self._company_insight_prompt()
+        return self._invoke("generate_company_insight", prompt, {"company_name": company_name}, ttl=COMPANY_INSIGHT_TTL)
+
+    async def agenerate_company_insight(self, company_name):
+        prompt = self._company_insight_prompt()
+        return await self._ainvoke("generate_company_insight", prompt, {"company_name": company_name}, ttl=COMPANY_INSIGHT_TTL)
+
+    # --- ASYNC PIPELINE ---
+    async def _aresearch_company(self, company_name, timings):
+        started = time.perf_counter()
+        context = ""
+        if company_name:
+            from src.web_search import get_company_info
+            context = await asyncio.to_thread(get_company_info, company_name)
+            if not context:
+                context = await self.agenerate_company_insight(company_name)
+        timings["company"] = time.perf_counter() - started
+        return context
+
+    def _embed_and_score(self, resume_text, job_desc, timings):
+        """(score, (texts, matrix)); both come from this call's own knowledge base, not shared state."""
+        started = time.perf_counter()
+        knowledge_base = self.create_knowledge_base(resume_text)
+        score = self.calculate_similarity(job_desc, matrix=knowledge_base[1])
+        timings["embedding"] = time.perf_counter() - started
+        return score, knowledge_base
+
+    async def _aanalyze_timed(self, resume_text, job_desc, persona, timings, embed_task=None, on_token=None):
+        knowledge_base = None
+        if embed_task is not None:
+            _, knowledge_base = await embed_task  # retrieval draws from the chunks the embedding step builds
+        started = time.perf_counter()
+        analysis = await self.aanalyze_profile(resume_text, job_desc, persona, knowledge_base, on_token)
+        timings["analysis"] = time.perf_counter() - started
+        return analysis
+
+    async def _ainsights_timed(self, resume_text, job_desc, timings):
+        started = time.perf_counter()
+        try:
+            return await self.aextract_profile_insights(resume_text, job_desc)
+        except Exception as e:
+            # Tabs fall back to on-demand extraction; the core analysis should still succeed.
+            print(f"DEBUG: Insight extraction failed ({str(e)}).")
+            return None
+        finally:
+            timings["insights"] = time.perf_counter() - started
+
+    async def run_analysis(self, resume_file, job_desc, persona="HR Recruiter", company_name=None, on_token=None):
+        """
+        Full Analyze flow with independent steps running concurrently: company research
+        starts immediately, then embedding (in a worker thread), the LLM analysis and the
+        structured skill/keyword extraction run side by side once the resume text is extracted.
+        In retrieval mode the analysis waits for the embedding step, whose chunks it draws from.
+        on_token streams the analysis as it is written (called on the event loop's thread).
+        """
+        started = time.perf_counter()
+        timings = {}
+        company_task = asyncio.create_task(self._aresearch_company(company_name, timings))
+        resume_text, extraction = await asyncio.to_thread(extract_text_cached, resume_file)
+        timings["extraction"] = time.perf_counter() - started
+        embed_task = asyncio.create_task(asyncio.to_thread(self._embed_and_score, resume_text, job_desc, timings))
+        (score, _), analysis, insights, context = await asyncio.gather(
+            embed_task,
+            self._aanalyze_timed(resume_text, job_desc, persona, timings, embed_task if self.retrieval_k else None, on_token),
+            self._ainsights_timed(resume_text, job_desc, timings),
+            company_task
+        )
+        timings["total"] = time.perf_counter() - started
+        return AnalysisResult(resume_text, score, analysis, context, insights, timings, extraction["pages_skipped"])
+
     def generate_learning_plan(self, missing_skills):
         prompt = PromptTemplate(
             input_variables=["missing_skills"],
@@ -174,37 +724,57 @@ class CareerAI:
             Output in Markdown.
             """
         )
-        return (prompt | self.llm).invoke({"missing_skills": missing_skills}).content
+        return self._invoke("generate_learning_plan", prompt, {"missing_skills": missing_skills})
+
+    def _tailor_prompt(self):
+        return PromptTemplate(
+            input_variables=["resume", "job_desc"],
+            template="""
+            You are an expert Career Coach and Resume Writer specialized in ATS optimization. 
+
+            TASK:
+            Rewrite the provided resume to target the specific Job Description (JD).
+
+            GUIDELINES:
+            1. STRUCTURE: Keep the standard sections (Summary, Experience, Skills, Education).
+            2. KEYWORDS: Naturally integrate specific technical keywords from the JD into the bullet points.
+            3. IMPACT: Rewrite bullet points using the "Action + Context + Result" format (e.g., "Improved latency by 20% by refactoring API endpoints").
+            4. RELEVANCE: Prioritize experience that matches the JD. De-emphasize irrelevant tasks.
+            5. TRUTH: Do NOT invent experiences or skills. Only optimize what is present.
+            6. FORMAT: Return the result in clean Markdown format.
+
+            RESUME CONTENT:
+            {resume}
+
+            TARGET JOB DESCRIPTION:
+            {job_desc}
+
+            OUTPUT:
+            Provide the fully rewritten resume in Markdown.
+            """
+        )
+
+    def rewrite_summary(self, resume_text, job_desc, company_name=None):
+        """Short targeted rewrite of the resume summary."""
+        prompt = PromptTemplate(
+            input_variables=["resume", "job_desc", "company_name"],
+            template="Rewrite resume summary for {company_name} job: {job_desc} Original: {resume}"
+        )
+        return self._invoke("rewrite_summary", prompt, {
+            "resume": resume_text, "job_desc": job_desc, "company_name": company_name or "the target company"
+        })
 
-    # --- CORRECTED METHOD: INDENTED INSIDE THE CLASS ---
     def tailor_resume(self, resume_text, job_desc):
         """
         Rewrites the entire resume to align with the specific Job Description.
         """
-        prompt = f"""
-        You are an expert Career Coach and Resume Writer specialized in ATS optimization. 
-        
-        TASK:
-        Rewrite the provided resume to target the specific Job Description (JD).
-        
-        GUIDELINES:
-        1. STRUCTURE: Keep the standard sections (Summary, Experience, Skills, Education).
-        2. KEYWORDS: Naturally integrate specific technical keywords from the JD into the bullet points.
-        3. IMPACT: Rewrite bullet points using the "Action + Context + Result" format (e.g., "Improved latency by 20% by refactoring API endpoints").
-        4. RELEVANCE: Prioritize experience that matches the JD. De-emphasize irrelevant tasks.
-        5. TRUTH: Do NOT invent experiences or skills. Only optimize what is present.
-        6. FORMAT: Return the result in clean Markdown format.
+        resume = self._resume_context(resume_text, job_desc)
+        return self._invoke("tailor_resume", self._tailor_prompt(), {"resume": resume, "job_desc": job_desc})
 
-        RESUME CONTENT:
-        {resume_text}
+    def stream_tailor_resume(self, resume_text, job_desc):
+        resume = self._resume_context(resume_text, job_desc)
+        return self._stream("tailor_resume", self._tailor_prompt(), {"resume": resume, "job_desc": job_desc})
 
-        TARGET JOB DESCRIPTION:
-        {job_desc}
-
-        OUTPUT:
-        Provide the fully rewritten resume in Markdown.
-        """
-        
-        # Using self.llm directly since ChatGroq supports string input invoke
-        response = self.llm.invoke(prompt)
-        return response.content
\ No newline at end of file
+    def astream_tailor_resume(self, resume_text, job_desc):
+        resume = self._resume_context(resume_text, job_desc)
+        return self._astream("tailor_resume", self._tailor_prompt(), {"resume": resume, "job_desc": job_desc})
\ No newline at end of file
@@ -1,16 +1,150 @@
-import pdfplumber
+import io
+import multiprocessing
+import os
 import re
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-def extract_text_from_pdf(file):
-    """Extracts clean text from a PDF file object."""
+from src.storage import LRUCache, sha256_bytes
+
+# Documents with fewer pages than this are parsed in-process; spinning up workers costs more.
+PARALLEL_MIN_PAGES = 8
+# Pages past this are not extracted; how many were dropped is logged and reported.
+MAX_PAGES = 40
+# Pages whose decoded content stream is larger than this are table/graphics-heavy layouts
+# (roughly 15k+ glyphs) that take seconds to parse and rarely hold resume prose, so they are
+# skipped. The stream size is known before pdfplumber lays out a single character.
+MAX_PAGE_CONTENT_BYTES = 120_000
+
+# Whitespace runs and non-ASCII runs both collapse to one space, in a single pass.
+_JUNK = re.compile(r"(?:\s|[^\x00-\x7F])+")
+
+PDF_WORKERS = int(os.getenv("CAREERFORGE_PDF_WORKERS", os.cpu_count() or 2))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Extracted text per sha256 of the uploaded bytes, shared by every session in the process.
+_text_cache = LRUCache(max_entries=int(os.getenv("CAREERFORGE_TEXT_CACHE_ENTRIES", "64")))
+text_cache_stats = {"hits": 0, "misses": 0, "extract_seconds": 0.0}
+
+
+def _get_pool():
+    """Process pool shared by every caller in this process, created on first large PDF."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Never fork the (threaded, possibly torch-loaded) server process; forked children can deadlock.
+            method = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _pool = ProcessPoolExecutor(max_workers=PDF_WORKERS, mp_context=multiprocessing.get_context(method))
+        return _pool
+
+
+def _discard_pool(pool):
+    """Drops a broken pool (e.g. a worker was OOM-killed) so the next large PDF gets a fresh one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _read_source(file):
+    """Paths are passed through; file objects (e.g. Streamlit uploads) are read into bytes."""
+    if isinstance(file, (str, os.PathLike, bytes)):
+        return file
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return file.read()
+
+
+def _open(source):
+    import pdfplumber  # deferred so the app can render before the first upload
+    return pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+
+def _content_bytes(page):
+    """Decoded size of the page's content stream(s): cheap compared to laying out its chars."""
+    from pdfminer.pdftypes import resolve1
+    return sum(len(resolve1(stream).get_data()) for stream in page.page_obj.contents or [])
+
+
+def _page_text(page, max_page_bytes):
     text = ""
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            text += page.extract_text() or ""
-    return _clean_text(text)
+    if not max_page_bytes or _content_bytes(page) <= max_page_bytes:
+        text = _clean_text(page.extract_text() or "")
+    page.close()  # drop pdfplumber's per-page object cache as we go
+    return text
+
+
+def iter_page_texts(file, max_pages=MAX_PAGES, max_page_bytes=MAX_PAGE_CONTENT_BYTES, start=0):
+    """Yields cleaned text page by page for pages [start, max_pages), skipping empty and layout-heavy pages."""
+    with _open(_read_source(file)) as pdf:
+        for page in pdf.pages[start:max_pages]:
+            text = _page_text(page, max_page_bytes)
+            if text:
+                yield text
+
+
+def _extract_range(source, start, stop, max_page_bytes):
+    """Worker: cleaned, non-empty texts for pages [start, stop)."""
+    return list(iter_page_texts(source, stop, max_page_bytes, start=start))
+
+
+def _extract(source, parallel, max_pages, max_page_bytes):
+    """(text, number of pages past max_pages that were not extracted)."""
+    with _open(source) as pdf:
+        total = len(pdf.pages)
+    page_count = min(total, max_pages)
+    if total > page_count:
+        print(f"DEBUG: PDF has {total} pages; skipped the {total - page_count} after page {page_count}.")
+    if not parallel or page_count < PARALLEL_MIN_PAGES:
+        return " ".join(iter_page_texts(source, page_count, max_page_bytes)), total - page_count
+
+    pool = _get_pool()
+    step = -(-page_count // PDF_WORKERS)  # ceil: one contiguous page range per worker
+    ranges = [(start, min(start + step, page_count)) for start in range(0, page_count, step)]
+    try:
+        futures = [pool.submit(_extract_range, source, start, stop, max_page_bytes) for start, stop in ranges]
+        return " ".join(text for future in futures for text in future.result()), total - page_count
+    except BrokenProcessPool:
+        print("DEBUG: PDF worker pool broke; replacing it and extracting this file in-process.")
+        _discard_pool(pool)
+        return " ".join(iter_page_texts(source, page_count, max_page_bytes)), total - page_count
+
+
+def extract_text_from_pdf(file, parallel=True, max_pages=MAX_PAGES, max_page_bytes=MAX_PAGE_CONTENT_BYTES):
+    """Extracts clean text from a PDF path or file object (pages past max_pages are skipped and logged)."""
+    return _extract(_read_source(file), parallel, max_pages, max_page_bytes)[0]
+
+
+def extract_text_cached(file, parallel=True, max_pages=MAX_PAGES, max_page_bytes=MAX_PAGE_CONTENT_BYTES):
+    """
+    extract_text_from_pdf memoised on the SHA-256 of the PDF bytes and the page limits.
+    Returns (text, info) where info has "cached", "extract_seconds" (time of the original
+    parse) and "pages_skipped" (pages past max_pages that were not extracted).
+    """
+    source = _read_source(file)
+    if not isinstance(source, bytes):
+        with open(source, "rb") as f:
+            source = f.read()
+    # The limits change the text, so the same file under different limits is a different entry.
+    key = f"{sha256_bytes(source)}:{max_pages}:{max_page_bytes}"
+    entry = _text_cache.get(key)
+    if entry is not None:
+        text_cache_stats["hits"] += 1
+        return entry[0], {"cached": True, "extract_seconds": entry[1], "pages_skipped": entry[2]}
+    started = time.perf_counter()
+    text, pages_skipped = _extract(source, parallel, max_pages, max_page_bytes)
+    seconds = time.perf_counter() - started
+    _text_cache.put(key, (text, seconds, pages_skipped))
+    text_cache_stats["misses"] += 1
+    text_cache_stats["extract_seconds"] += seconds
+    return text, {"cached": False, "extract_seconds": seconds, "pages_skipped": pages_skipped}
+
 
 def _clean_text(text):
     """Internal helper to clean whitespace and artifacts."""
-    text = re.sub(r'\s+', ' ', text)  # Remove extra whitespace
-    text = re.sub(r'[^\x00-\x7F]+', ' ', text)  # Remove non-ASCII
-    return text.strip()
\ No newline at end of file
+    return _JUNK.sub(" ", text).strip()
@@ -0,0 +1,220 @@
+"""
+Client-side limiter for Groq calls: request and token buckets sized to our quota,
+a bounded number of in-flight calls, and retries with jittered exponential backoff
+that honour Retry-After on 429/5xx and connection errors.
+"""
+import asyncio
+import os
+import random
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+_RETRYABLE_NAMES = {"APIConnectionError", "APITimeoutError"}
+
+# Per-process quotas; 0 disables a bucket.
+LIMITS = {
+    "chat": {
+        "requests_per_minute": int(os.getenv("CAREERFORGE_GROQ_RPM", "30")),
+        "tokens_per_minute": int(os.getenv("CAREERFORGE_GROQ_TPM", "12000")),
+        "max_concurrency": int(os.getenv("CAREERFORGE_GROQ_CONCURRENCY", "4")),
+    },
+    "audio": {
+        "requests_per_minute": int(os.getenv("CAREERFORGE_WHISPER_RPM", "20")),
+        "tokens_per_minute": 0,
+        "max_concurrency": int(os.getenv("CAREERFORGE_WHISPER_CONCURRENCY", "4")),
+    },
+}
+MAX_RETRIES = int(os.getenv("CAREERFORGE_GROQ_MAX_RETRIES", "5"))
+
+
+class TokenBucket:
+    """Refills at `rate` units/sec up to `capacity`; reservations may go into debt."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount):
+        """Takes `amount` now and returns the seconds to wait before using it."""
+        with self._lock:
+            now = time.monotonic()
+            self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+            self.updated = now
+            # One oversized request may drain the bucket, but must not wait forever.
+            self.level -= min(amount, self.capacity)
+            return max(0.0, -self.level / self.rate)
+
+    def refund(self, amount):
+        """Returns over-reserved units (or charges more with a negative amount)."""
+        with self._lock:
+            self.level = min(self.capacity, self.level + amount)
+
+
+def _status(error):
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status
+
+
+def is_retryable(error):
+    status = _status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS
+    return type(error).__name__ in _RETRYABLE_NAMES or isinstance(error, (ConnectionError, TimeoutError))
+
+
+def retry_after(error):
+    """Seconds from a Retry-After header (delta-seconds or HTTP date), or None."""
+    headers = getattr(getattr(error, "response", None), "headers", None) or {}
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class RateLimiter:
+    """Admission control plus retries for sync, async and streaming calls."""
+
+    def __init__(self, requests_per_minute=0, tokens_per_minute=0, max_concurrency=4,
+                 max_retries=MAX_RETRIES, base_delay=1.0, max_delay=30.0):
+        self.requests = TokenBucket(requests_per_minute / 60, requests_per_minute) if requests_per_minute else None
+        self.tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute) if tokens_per_minute else None
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self.calls = self.retries = self.failures = 0
+        self.queue_wait = self.max_queue_wait = 0.0
+
+    # --- BOOKKEEPING ---
+    def _admission_delay(self, tokens):
+        delays = [0.0]
+        if self.requests:
+            delays.append(self.requests.reserve(1))
+        if self.tokens and tokens:
+            delays.append(self.tokens.reserve(tokens))
+        return max(delays)
+
+    def _admitted(self, queued_at):
+        waited = time.perf_counter() - queued_at
+        with self._lock:
+            self.calls += 1
+            self.queue_wait += waited
+            self.max_queue_wait = max(self.max_queue_wait, waited)
+
+    def _on_error(self, error, attempt, tokens=0, started_output=False):
+        """Returns the backoff delay, or re-raises when the error is final."""
+        if started_output or attempt >= self.max_retries or not is_retryable(error):
+            with self._lock:
+                self.failures += 1
+            if self.tokens and tokens and not started_output:
+                self.tokens.refund(tokens)  # nothing was generated; give the reservation back
+            raise error
+        with self._lock:
+            self.retries += 1
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))  # full jitter
+        hinted = retry_after(error)
+        return max(delay, hinted) if hinted is not None else delay
+
+    def settle(self, reserved_tokens, actual_tokens):
+        """Corrects the token bucket once a call's real usage is known."""
+        if self.tokens:
+            self.tokens.refund(reserved_tokens - actual_tokens)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "calls": self.calls, "retries": self.retries, "failures": self.failures,
+                "avg_queue_wait": self.queue_wait / self.calls if self.calls else 0.0,
+                "max_queue_wait": self.max_queue_wait,
+            }
+
+    # --- SYNC ---
+    def _enter(self, tokens):
+        queued_at = time.perf_counter()
+        time.sleep(self._admission_delay(tokens))
+        self._slots.acquire()
+        self._admitted(queued_at)
+
+    def call(self, fn, *args, tokens=0, **kwargs):
+        # Tokens are reserved once per call, not per attempt; settle() or a final failure releases them.
+        for attempt in range(self.max_retries + 1):
+            self._enter(tokens if attempt == 0 else 0)
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt, tokens)
+            finally:
+                self._slots.release()
+            time.sleep(delay)
+
+    def stream(self, open_stream, tokens=0):
+        """Yields from open_stream(); retries only until the first item has been yielded."""
+        for attempt in range(self.max_retries + 1):
+            self._enter(tokens if attempt == 0 else 0)
+            started = False
+            try:
+                for item in open_stream():
+                    started = True
+                    yield item
+                return
+            except Exception as e:
+                delay = self._on_error(e, attempt, tokens, started)
+            finally:
+                self._slots.release()
+            time.sleep(delay)
+
+    # --- ASYNC ---
+    async def _aenter(self, tokens):
+        queued_at = time.perf_counter()
+        await asyncio.sleep(self._admission_delay(tokens))
+        # A threading semaphore is shared with sync callers; poll it instead of blocking the loop.
+        while not self._slots.acquire(blocking=False):
+            await asyncio.sleep(0.05)
+        self._admitted(queued_at)
+
+    async def acall(self, fn, *args, tokens=0, **kwargs):
+        for attempt in range(self.max_retries + 1):
+            await self._aenter(tokens if attempt == 0 else 0)
+            try:
+                return await fn(*args, **kwargs)
+            except Exception as e:
+                delay = self._on_error(e, attempt, tokens)
+            finally:
+                self._slots.release()
+            await asyncio.sleep(delay)
+
+    async def astream(self, open_stream, tokens=0):
+        for attempt in range(self.max_retries + 1):
+            await self._aenter(tokens if attempt == 0 else 0)
+            started = False
+            try:
+                async for item in open_stream():
+                    started = True
+                    yield item
+                return
+            except Exception as e:
+                delay = self._on_error(e, attempt, tokens, started)
+            finally:
+                self._slots.release()
+            await asyncio.sleep(delay)
+
+
+@lru_cache(maxsize=None)
+def get_rate_limiter(name):
+    """One limiter per quota ("chat", "audio"), shared by every agent and session in the process."""
+    return RateLimiter(**LIMITS[name])
@@ -0,0 +1,166 @@
+import re
+from statistics import median
+
+from src.chunker import SECTION_HEADINGS
+from src.pdf_handler import _open, _read_source
+
+BULLET_CHARS = "•▪●◦‣■□➢➤►-–*·"
+_DATE = re.compile(
+    r"((?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(?:\d{1,2}/)?(?:19|20)\d{2}"
+    r"\s*(?:-|–|—|to)\s*"
+    r"(?:(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)?(?:\d{1,2}/)?(?:19|20)\d{2}|present|current|now)"
+    r"|(?:(?:jan|feb|mar|apr|may|jun|jul|aug|sep|sept|oct|nov|dec)[a-z]*\.?\s+)(?:19|20)\d{2})",
+    re.IGNORECASE
+)
+# Bullet glyphs from fonts without a unicode map come out as "(cid:NNN)".
+_BULLET = re.compile(r"^(?:\(cid:\d+\)|[%s])\s*" % re.escape(BULLET_CHARS))
+_HEADINGS = {h.lower() for h in SECTION_HEADINGS}
+_CONTACT = re.compile(
+    r"[\w.+-]+@[\w-]+\.[\w.]+"                          # email
+    r"|\+?\d[\d\s().-]{7,}\d"                          # phone
+    r"|https?://|www\.|linkedin|github\.com|\w\.(?:com|io|dev|me)\b",  # profile/portfolio URL
+    re.IGNORECASE
+)
+
+# Which sections each task actually needs; matched as substrings of section titles.
+TASK_SECTIONS = {
+    "cover_letter": ("summary", "profile", "objective", "experience", "projects", "skills", "achievements"),
+    "cold_email": ("summary", "profile", "experience", "skills"),
+    "interview": ("experience", "projects", "skills"),
+    "skills": ("skills", "certifications"),
+}
+
+
+def _clean(text):
+    return re.sub(r"(?:\s|[^\x00-\x7F])+", " ", text).strip()
+
+
+def _lines(page, tolerance=3):
+    """Groups words into visual lines with their left edge, font size and boldness."""
+    words = page.extract_words(extra_attrs=["size", "fontname"], use_text_flow=True)
+    lines = []
+    for word in sorted(words, key=lambda w: (round(w["top"] / tolerance), w["x0"])):
+        if lines and abs(lines[-1]["top"] - word["top"]) <= tolerance:
+            line = lines[-1]
+            line["words"].append(word["text"])
+            line["size"] = max(line["size"], word["size"])
+            line["bold"] = line["bold"] and "bold" in word["fontname"].lower()
+        else:
+            lines.append({
+                "top": word["top"], "x0": word["x0"], "size": word["size"],
+                "bold": "bold" in word["fontname"].lower(), "words": [word["text"]]
+            })
+    for line in lines:
+        line["text"] = " ".join(line["words"])
+    return lines
+
+
+def _is_heading(line, body_size, in_section):
+    text = line["text"].strip().rstrip(":")
+    if text.lower() in _HEADINGS:
+        return True
+    if not in_section:
+        return False  # the name at the top is big and often upper-case, but it's contact info
+    short = 0 < len(text.split()) <= 4 and not _DATE.search(text) and any(c.isalpha() for c in text)
+    return short and (text.isupper() or line["size"] > body_size * 1.15)
+
+
+def _is_contact(text, first):
+    """Header lines: the name (first line), anything with an email/phone/URL, and short taglines."""
+    if first or _CONTACT.search(text):
+        return True
+    return len(text.split()) <= 8 and not text.rstrip().endswith(".")
+
+
+def parse_resume(file, max_pages=10):
+    """
+    Layout-aware parse of a resume PDF into
+    {"contact": [..], "sections": [{"title", "text": [..], "entries": [{"heading", "dates", "bullets"}]}]}.
+    Headings come from known section names, all-caps lines or larger fonts; a line with a
+    date range opens a new role/entry; bullet glyphs and hanging indents build bullets.
+    Before the first heading only real header lines go to "contact"; an unheaded
+    paragraph there becomes a "Summary" section.
+    """
+    with _open(_read_source(file)) as pdf:
+        lines = [line for page in pdf.pages[:max_pages] for line in _lines(page)]
+    if not lines:
+        return {"contact": [], "sections": []}
+    body_size = median(line["size"] for line in lines)
+
+    parsed = {"contact": [], "sections": []}
+    section = entry = None
+    bullet_x0 = None
+    for line in lines:
+        raw = line["text"].strip()
+        if _is_heading(line, body_size, section is not None):
+            section = {"title": _clean(raw).rstrip(":").title(), "text": [], "entries": []}
+            parsed["sections"].append(section)
+            entry = bullet_x0 = None
+            continue
+        if section is None:
+            if _is_contact(_clean(raw), not parsed["contact"]):
+                parsed["contact"].append(_clean(raw))
+                continue
+            section = {"title": "Summary", "text": [], "entries": []}
+            parsed["sections"].append(section)
+
+        bullet = _BULLET.match(raw)
+        if bullet:
+            if entry is None:
+                entry = {"heading": None, "dates": None, "bullets": []}
+                section["entries"].append(entry)
+            entry["bullets"].append(_clean(raw[bullet.end():]))
+            bullet_x0 = line["x0"]
+            continue
+        # Hanging indent: wrapped continuation of the previous bullet.
+        if entry and entry["bullets"] and bullet_x0 is not None and line["x0"] > bullet_x0 + 2:
+            entry["bullets"][-1] += " " + _clean(raw)
+            continue
+
+        text = _clean(raw)
+        date = _DATE.search(text)
+        if date:
+            heading = _clean(text[:date.start()] + " " + text[date.end():]).strip(" ,|-")
+            if entry and entry["dates"] is None and not entry["bullets"]:
+                # Company line followed by a title/date line: one entry.
+                entry["heading"] = " | ".join(filter(None, [entry["heading"], heading]))
+                entry["dates"] = date.group(0)
+            else:
+                entry = {"heading": heading or None, "dates": date.group(0), "bullets": []}
+                section["entries"].append(entry)
+            bullet_x0 = None
+        elif line["bold"] and len(text.split()) <= 12:
+            entry = {"heading": text, "dates": None, "bullets": []}
+            section["entries"].append(entry)
+            bullet_x0 = None
+        elif entry:
+            entry["bullets"].append(text)  # un-bulleted description line under a role
+        else:
+            section["text"].append(text)
+    return parsed
+
+
+def select_sections(parsed, task):
+    """Keeps only the sections a task needs (falls back to everything if none match)."""
+    wanted = TASK_SECTIONS.get(task)
+    if not wanted:
+        return parsed
+    sections = [s for s in parsed["sections"] if any(w in s["title"].lower() for w in wanted)]
+    return {"contact": parsed["contact"], "sections": sections or parsed["sections"]}
+
+
+def to_compact_text(parsed, include_contact=False):
+    """
+    Compact, prompt-friendly rendering that keeps structure: upper-case section
+    headings on their own line, one line per role, "- " bullets. include_contact keeps
+    the name/contact header, for outputs that are signed or are a whole resume.
+    """
+    out = list(parsed["contact"]) if include_contact else []
+    for section in parsed["sections"]:
+        out.append(section["title"].upper())
+        out.extend(section["text"])
+        for entry in section["entries"]:
+            if entry["heading"] or entry["dates"]:
+                out.append(" ".join(filter(None, [entry["heading"], f"({entry['dates']})" if entry["dates"] else None])))
+            out.extend(f"- {bullet}" for bullet in entry["bullets"])
+    return "\n".join(out)
@@ -0,0 +1,63 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Root for every on-disk cache; shared by all Streamlit sessions and worker processes.
+CACHE_DIR = os.getenv("CAREERFORGE_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".cache", "careerforge"))
+
+
+def cache_path(*parts):
+    """Returns a path under CACHE_DIR, creating its parent directory if needed."""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def sha256_text(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def sha256_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def slugify(name):
+    """Filesystem-safe version of a model or company name."""
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name)
+
+
+class LRUCache:
+    """Small thread-safe in-memory LRU with optional per-entry TTL (seconds)."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires is not None and expires < time.time():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl if ttl else None)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
@@ -0,0 +1,185 @@
+import json
+import math
+import os
+import threading
+
+import faiss
+import numpy as np
+
+from src.storage import cache_path
+
+# Chunk ids pack the resume's internal id in the high bits so a whole resume can be
+# removed with one IDSelectorRange and hits can be grouped back to resumes cheaply.
+_CHUNK_BITS = 16
+MIN_TRAIN_VECTORS = 10000
+# The IVF index is retrained whenever the pool grows to this many times the size it was
+# trained at, so nlist keeps up with the corpus (amortised O(N) training overall).
+RETRAIN_GROWTH = 2
+
+
+def _chunk_range(rid):
+    return rid << _CHUNK_BITS, (rid + 1) << _CHUNK_BITS
+
+
+class TalentPool:
+    """
+    Multi-resume vector store for "top N candidates for this JD" over large corpora.
+
+    Small pools use an exact flat inner-product index. Once the pool holds
+    MIN_TRAIN_VECTORS chunks it is rebuilt as an IVF index (nlist ~ 4*sqrt(N)),
+    optionally with 8-bit scalar quantisation to keep 100k+ resumes in memory, and
+    retrained each time it grows RETRAIN_GROWTH-fold.
+    `nprobe` is the recall-vs-latency knob: more probed lists = higher recall, slower queries.
+    """
+
+    def __init__(self, embeddings, chunk_text, path=None, codec="SQ8", nprobe=16):
+        self.embeddings = embeddings
+        self.chunk_text = chunk_text
+        self.path = path or cache_path("talent_pool", "pool.faiss")
+        self.codec = codec
+        self.nprobe = nprobe
+        self.index = None
+        self.resumes = {}  # external resume id -> {"rid": int, "chunks": int}
+        self.next_rid = 0
+        self.trained_at = 0  # vector count at the last IVF training (0: still flat)
+        self._by_rid = {}
+        self._lock = threading.RLock()
+
+    # --- PERSISTENCE ---
+    def save(self):
+        with self._lock:
+            if self.index is None: return
+            faiss.write_index(self.index, self.path + ".tmp")
+            with open(self.path + ".json.tmp", "w", encoding="utf-8") as f:
+                json.dump({"next_rid": self.next_rid, "codec": self.codec, "trained_at": self.trained_at,
+                           "resumes": self.resumes}, f)
+            os.replace(self.path + ".tmp", self.path)
+            os.replace(self.path + ".json.tmp", self.path + ".json")
+
+    def load(self, mmap=False):
+        """Loads a saved pool. With mmap=True the index is read-only but costs almost no RAM."""
+        with self._lock:
+            if not os.path.exists(self.path + ".json"):
+                return False
+            flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if mmap else 0
+            self.index = faiss.read_index(self.path, flags)
+            with open(self.path + ".json", encoding="utf-8") as f:
+                meta = json.load(f)
+            self.next_rid = meta["next_rid"]
+            self.codec = meta["codec"]
+            self.resumes = meta["resumes"]
+            # Pools saved before retraining was tracked: treat the current size as the trained size.
+            self.trained_at = meta.get("trained_at", self.index.ntotal if self.is_ann else 0)
+            self._by_rid = {entry["rid"]: resume_id for resume_id, entry in self.resumes.items()}
+            return True
+
+    # --- INDEX MANAGEMENT ---
+    @property
+    def is_ann(self):
+        return self.index is not None and faiss.try_extract_index_ivf(self.index) is not None
+
+    def _vector_count(self):
+        return self.index.ntotal if self.index is not None else 0
+
+    def rebuild(self, nlist=None):
+        """Retrains the pool as an IVF index over its current vectors (call as the corpus grows)."""
+        with self._lock:
+            if self.index is None: return
+            count = self.index.ntotal
+            if self.is_ann:
+                ivf = faiss.extract_index_ivf(self.index)
+                ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+                ids = np.concatenate([faiss.rev_swig_ptr(ivf.invlists.get_ids(l), ivf.invlists.list_size(l)).copy()
+                                      for l in range(ivf.nlist) if ivf.invlists.list_size(l)])
+                vectors = self.index.reconstruct_batch(ids)
+            else:
+                ids = faiss.vector_to_array(self.index.id_map).astype(np.int64)
+                vectors = self.index.index.reconstruct_n(0, count)
+            nlist = nlist or max(1, min(int(4 * math.sqrt(count)), count // 39))
+            index = faiss.index_factory(vectors.shape[1], f"IVF{nlist},{self.codec}", faiss.METRIC_INNER_PRODUCT)
+            index.train(vectors)
+            index.add_with_ids(vectors, ids)
+            self.index = index
+            self.trained_at = count
+
+    # --- RESUMES ---
+    def add_resumes(self, resumes):
+        """Adds or replaces resumes given as {resume_id: text}; all chunks are embedded in one batch."""
+        items = [(str(resume_id), self.chunk_text(text)) for resume_id, text in resumes.items() if text]
+        flat = [chunk for _, chunks in items for chunk in chunks[:1 << _CHUNK_BITS]]
+        if not flat: return
+        vectors = np.asarray(self.embeddings.embed_documents(flat), dtype=np.float32)
+        faiss.normalize_L2(vectors)
+        with self._lock:
+            if self.index is None:
+                self.index = faiss.IndexIDMap2(faiss.IndexFlatIP(vectors.shape[1]))
+            ids = []
+            for resume_id, chunks in items:
+                self._remove(resume_id)
+                rid = self.next_rid
+                self.next_rid += 1
+                n = min(len(chunks), 1 << _CHUNK_BITS)
+                ids.extend(_chunk_range(rid)[0] + np.arange(n))
+                self.resumes[resume_id] = {"rid": rid, "chunks": n}
+                self._by_rid[rid] = resume_id
+            self.index.add_with_ids(vectors, np.asarray(ids, dtype=np.int64))
+            if self._needs_training():
+                self.rebuild()
+
+    def _needs_training(self):
+        if not self.is_ann:
+            return self.index.ntotal >= MIN_TRAIN_VECTORS
+        return self.index.ntotal >= RETRAIN_GROWTH * max(self.trained_at, MIN_TRAIN_VECTORS)
+
+    def add_resume(self, resume_id, text):
+        self.add_resumes({resume_id: text})
+
+    def _remove(self, resume_id):
+        entry = self.resumes.pop(resume_id, None)
+        if entry is not None:
+            del self._by_rid[entry["rid"]]
+            self.index.remove_ids(faiss.IDSelectorRange(*_chunk_range(entry["rid"])))
+
+    def remove_resume(self, resume_id):
+        with self._lock:
+            self._remove(str(resume_id))
+
+    def __len__(self):
+        return len(self.resumes)
+
+    # --- SEARCH ---
+    def _group_hits(self, scores, ids):
+        grouped = {}
+        for score, chunk_id in zip(scores, ids):
+            if chunk_id < 0: continue
+            resume_id = self._by_rid.get(int(chunk_id) >> _CHUNK_BITS)
+            if resume_id is not None:
+                grouped.setdefault(resume_id, []).append(float(score))
+        return grouped
+
+    def search(self, job_desc, top_n=50, nprobe=None, oversample=8, aggregate="max"):
+        """
+        Returns the top_n resumes as [{"resume_id", "score", "hits"}], best first.
+        Chunk hits are grouped per resume and scored by their max (or mean) similarity.
+        Starts with top_n*oversample chunk hits and widens the search while strong
+        candidates' many chunks crowd out the rest and fewer than top_n resumes come back.
+        """
+        if not self.resumes: return []
+        query = np.asarray([self.embeddings.embed_query(job_desc)], dtype=np.float32)
+        faiss.normalize_L2(query)
+        with self._lock:
+            if self.is_ann:
+                faiss.extract_index_ivf(self.index).nprobe = nprobe or self.nprobe
+            total = self._vector_count()
+            k = min(total, top_n * oversample)
+            while True:
+                scores, ids = self.index.search(query, k)
+                grouped = self._group_hits(scores[0], ids[0])
+                # -1 ids: the probed IVF lists are exhausted, a larger k can't add anything.
+                if len(grouped) >= top_n or k >= total or ids[0][-1] < 0:
+                    break
+                k = min(total, k * 4)
+        reduce = max if aggregate == "max" else (lambda s: sum(s) / len(s))
+        ranked = sorted(((reduce(s), resume_id, len(s)) for resume_id, s in grouped.items()), reverse=True)
+        return [{"resume_id": resume_id, "score": int(score * 100), "hits": hits}
+                for score, resume_id, hits in ranked[:top_n]]
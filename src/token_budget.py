@@ -0,0 +1,154 @@
+import json
+import math
+import os
+import threading
+from contextvars import ContextVar
+
+from src.chunker import _iter_units, approx_token_count, iter_sections
+
+# Llama-family BPE averages about 1.3 tokens per word/punctuation unit on resume and JD text.
+TOKENS_PER_UNIT = 1.3
+
+# Max input tokens per template variable, per CareerAI method. Unlisted inputs are unbounded.
+DEFAULT_BUDGETS = {
+    "analyze_profile": {"resume": 2500, "job_desc": 1200},
+    "extract_skills_json": {"resume": 2000, "job_desc": 1000},
+    "extract_profile_insights": {"resume": 2000, "job_desc": 1000},
+    "extract_matched_keywords": {"resume": 2000, "job_desc": 1000},
+    "generate_cover_letter": {"resume": 1500, "job_desc": 800},
+    "generate_interview_question": {"job_desc": 800},
+    "evaluate_interview_answer": {"user_answer": 1200},
+    "generate_cold_email": {"resume": 350, "job_desc": 200, "company_info": 300},
+    "rewrite_summary": {"resume": 400, "job_desc": 250},
+    "tailor_resume": {"resume": 3000, "job_desc": 1200},
+}
+
+
+def _env_budgets():
+    """Extra per-method overrides as JSON, e.g. '{"tailor_resume": {"resume": 4000}}'."""
+    try:
+        budgets = json.loads(os.getenv("CAREERFORGE_TOKEN_BUDGETS", "{}"))
+        valid = isinstance(budgets, dict) and all(
+            isinstance(limits, dict) and all(
+                isinstance(n, int) and not isinstance(n, bool) and n > 0 for n in limits.values()
+            )
+            for limits in budgets.values()
+        )
+        if not valid:
+            raise ValueError("expected {method: {input: positive int max_tokens}}")
+        return budgets
+    except ValueError as e:
+        print(f"DEBUG: Ignoring malformed CAREERFORGE_TOKEN_BUDGETS ({str(e)}).")
+        return {}
+
+
+_ENV_BUDGETS = _env_budgets()
+
+# USD per million (input, output) tokens.
+PRICES = {
+    "llama-3.3-70b-versatile": (0.59, 0.79),
+    "llama-3.1-8b-instant": (0.05, 0.08),
+}
+
+
+def count_tokens(text):
+    """Estimated LLM tokens; used for budgeting and when the API reports no usage."""
+    return math.ceil(approx_token_count(text or "") * TOKENS_PER_UNIT)
+
+
+def _truncate_words(text, max_tokens, count=count_tokens):
+    """Longest word prefix of text within max_tokens."""
+    words = text.split()
+    lo, hi = 0, len(words)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if count(" ".join(words[:mid])) <= max_tokens:
+            lo = mid
+        else:
+            hi = mid - 1
+    return " ".join(words[:lo])
+
+
+def fit_to_budget(text, max_tokens, count=count_tokens):
+    """
+    Shrinks text to max_tokens on sentence/bullet boundaries. Sections take turns
+    giving up their next unit, so every section keeps its heading and leading bullets
+    instead of the tail of the document being cut off. Falls back to a word-level cut
+    rather than returning nothing.
+    """
+    if not text or count(text) <= max_tokens:
+        return text
+    sections = [list(_iter_units(body, max_tokens, count)) for _, body in iter_sections(text)]
+    kept = [[] for _ in sections]
+    used, open_sections = 0, set(range(len(sections)))
+    for depth in range(max(map(len, sections), default=0)):
+        for i in sorted(open_sections):
+            if depth >= len(sections[i]):
+                open_sections.discard(i)
+                continue
+            cost = count(sections[i][depth])
+            if used + cost > max_tokens:
+                open_sections.discard(i)  # keep sections contiguous: no skipping ahead
+                continue
+            kept[i].append(sections[i][depth])
+            used += cost
+        if not open_sections:
+            break
+    fitted = "\n".join(" ".join(units) for units in kept if units)
+    return fitted if fitted and count(fitted) <= max_tokens else _truncate_words(text, max_tokens, count)
+
+
+def get_budgets(overrides=None):
+    """DEFAULT_BUDGETS merged with CAREERFORGE_TOKEN_BUDGETS and then overrides."""
+    budgets = {method: dict(limits) for method, limits in DEFAULT_BUDGETS.items()}
+    for extra in (_ENV_BUDGETS, overrides or {}):
+        for method, limits in extra.items():
+            budgets.setdefault(method, {}).update(limits)
+    return budgets
+
+
+class TokenUsage:
+    """Thread-safe prompt/completion token and cost totals, broken down by method."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.by_method = {}
+
+    def record(self, method, model, prompt_tokens, completion_tokens, estimated=False):
+        input_price, output_price = PRICES.get(model, (0.0, 0.0))
+        cost = (prompt_tokens * input_price + completion_tokens * output_price) / 1e6
+        with self._lock:
+            row = self.by_method.setdefault(method, {
+                "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cost": 0.0, "estimated_calls": 0
+            })
+            row["calls"] += 1
+            row["prompt_tokens"] += prompt_tokens
+            row["completion_tokens"] += completion_tokens
+            row["cost"] += cost
+            row["estimated_calls"] += int(estimated)
+
+    def totals(self):
+        with self._lock:
+            rows = list(self.by_method.values())
+        return {
+            key: sum(row[key] for row in rows)
+            for key in ("calls", "prompt_tokens", "completion_tokens", "cost", "estimated_calls")
+        }
+
+    def reset(self):
+        with self._lock:
+            self.by_method.clear()
+
+
+# Usage of the current Streamlit session (or any caller that sets one); the agent
+# itself is shared process-wide, so per-session totals ride on the context instead.
+_session_usage = ContextVar("session_usage", default=None)
+
+
+def track_session_usage(usage):
+    """Routes token accounting for calls made from this context into `usage` as well."""
+    _session_usage.set(usage)
+
+
+def session_usage():
+    return _session_usage.get()
@@ -1,47 +1,185 @@
-from duckduckgo_search import DDGS
-import time
+import os
+import re
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, as_completed
+from functools import lru_cache
+from urllib.parse import quote_plus
 
-def get_company_info(company_name):
+from src.llm_cache import ResponseCache
+from src.storage import cache_path
+
+# Company news/values change slowly; one search per company per day is plenty.
+COMPANY_INTEL_TTL = int(os.getenv("CAREERFORGE_COMPANY_INTEL_TTL", str(24 * 3600)))
+# "No results" is remembered briefly so a failing name isn't re-searched on every rerun.
+EMPTY_RESULT_TTL = 15 * 60
+# Tutorials for a skill barely change; cache them for a week.
+SKILL_RESOURCES_TTL = 7 * 24 * 3600
+SKILL_QUERY_TIMEOUT = float(os.getenv("CAREERFORGE_SKILL_QUERY_TIMEOUT", "12"))
+RESOURCE_WORKERS = int(os.getenv("CAREERFORGE_RESOURCE_WORKERS", "5"))
+
+_LEGAL_SUFFIX = re.compile(r"\b(?:inc|incorporated|ltd|limited|llc|corp|corporation|co|plc|gmbh|ag|sa)\b\.?$")
+
+_inflight = {}  # normalized name -> Future shared by every caller waiting on that search
+_inflight_lock = threading.Lock()
+_prefetch_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="company-prefetch")
+# Bounded across all sessions so a burst of Up-Skill clicks can't flood DuckDuckGo.
+_resource_pool = ThreadPoolExecutor(max_workers=RESOURCE_WORKERS, thread_name_prefix="skill-resources")
+
+
+def normalize_company(company_name):
+    """'  OpenAI, Inc. ' and 'openai' share one cache entry."""
+    name = re.sub(r"[^\w\s&-]", " ", company_name.lower())
+    name = re.sub(r"\s+", " ", name).strip()
+    return _LEGAL_SUFFIX.sub("", name).strip() or name
+
+
+@lru_cache(maxsize=None)
+def _intel_cache():
+    cache = ResponseCache(path=cache_path("company_intel.sqlite"), max_memory_entries=256)
+    cache.purge_expired()
+    return cache
+
+
+def _search_company(company_name):
     """
     Fetches company info using DuckDuckGo 'html' backend to avoid rate limits.
-    Returns None if all attempts fail, triggering the AI fallback.
+    Returns "" when nothing was found; raises on network/search errors.
     """
-    if not company_name:
+    from duckduckgo_search import DDGS
+
+    print(f"DEBUG: Searching web for {company_name}...")
+    results = []
+    # Use DDGS context manager
+    with DDGS() as ddgs:
+        # FIX: backend="html" is slower but avoids the '202 Ratelimit' error
+        # We request 3 results
+        search_gen = ddgs.text(
+            f"{company_name} company mission values tech stack recent news",
+            region="wt-wt",
+            safesearch="off",
+            backend="html",  # <--- THIS IS THE KEY FIX
+            max_results=3
+        )
+
+        if search_gen:
+            results = list(search_gen)
+
+    if not results:
+        print("DEBUG: No results found via HTML backend.")
+        return ""
+
+    # Format the output if successful
+    context = "### 🏢 Company Intelligence (Live Web Data):\n"
+    for result in results:
+        title = result.get('title', 'News')
+        body = result.get('body', '')
+        link = result.get('href', '')
+        context += f"- **{title}**: {body} ([Source]({link}))\n"
+    return context
+
+
+def get_company_info(company_name):
+    """
+    Company intel from the TTL disk cache, or a live web search. Concurrent lookups of the
+    same (normalized) company share one in-flight search. Returns None if nothing was
+    found or the search failed, triggering the AI fallback.
+    """
+    if not company_name or not company_name.strip():
         return None
-    
-    print(f"DEBUG: Searching web for {company_name}...") 
+    key = normalize_company(company_name)
+    cached = _intel_cache().get(key)
+    if cached is not None:
+        return cached or None
 
-    try:
-        results = []
-        # Use DDGS context manager
-        with DDGS() as ddgs:
-            # FIX: backend="html" is slower but avoids the '202 Ratelimit' error
-            # We request 3 results
-            search_gen = ddgs.text(
-                f"{company_name} company mission values tech stack recent news",
-                region="wt-wt", 
-                safesearch="off", 
-                backend="html",  # <--- THIS IS THE KEY FIX
-                max_results=3
-            )
-            
-            if search_gen:
-                results = list(search_gen)
-
-        if not results:
-            print("DEBUG: No results found via HTML backend.")
-            return None
-
-        # Format the output if successful
-        context = "### 🏢 Company Intelligence (Live Web Data):\n"
-        for result in results:
-            title = result.get('title', 'News')
-            body = result.get('body', '')
-            link = result.get('href', '')
-            context += f"- **{title}**: {body} ([Source]({link}))\n"
-            
-        return context
+    with _inflight_lock:
+        future = _inflight.get(key)
+        owner = future is None
+        if owner:
+            future = _inflight[key] = Future()
+    if not owner:
+        return future.result()
 
+    context = None
+    try:
+        # Another caller may have finished and cached it between our check and registering.
+        context = _intel_cache().get(key)
+        if context is None:
+            context = _search_company(company_name.strip())
+            _intel_cache().put(key, context, ttl=COMPANY_INTEL_TTL if context else EMPTY_RESULT_TTL)
     except Exception as e:
         print(f"DEBUG: Search failed ({str(e)}). Switching to Internal Knowledge.")
-        return None 
\ No newline at end of file
+    finally:
+        with _inflight_lock:
+            _inflight.pop(key, None)
+        future.set_result(context or None)
+    return context or None
+
+
+def normalize_skill(skill):
+    return re.sub(r"\s+", " ", skill).strip(" .,;:").lower()
+
+
+def dedupe_skills(skills):
+    """First spelling of each skill, dropping case/whitespace duplicates and blanks."""
+    seen = {}
+    for skill in skills:
+        key = normalize_skill(skill or "")
+        if key and key not in seen:
+            seen[key] = skill.strip()
+    return list(seen.values())
+
+
+def youtube_search_url(skill):
+    return f"https://www.youtube.com/results?search_query={quote_plus(skill + ' tutorial')}"
+
+
+def _skill_resources(skill, timeout):
+    """Markdown list of tutorial links for one skill ("" if none), cached per normalized name."""
+    key = f"skill:{normalize_skill(skill)}"
+    cached = _intel_cache().get(key)
+    if cached is not None:
+        return cached
+    from duckduckgo_search import DDGS
+
+    with DDGS(timeout=timeout) as ddgs:
+        results = list(ddgs.text(f"{skill} tutorial", region="wt-wt", safesearch="off", backend="html", max_results=3) or [])
+    resources = "".join(
+        f"- [{r.get('title', 'Tutorial')}]({r.get('href', '')}): {r.get('body', '')}\n" for r in results
+    )
+    _intel_cache().put(key, resources, ttl=SKILL_RESOURCES_TTL if resources else EMPTY_RESULT_TTL)
+    return resources
+
+
+def start_skill_resources(skills, timeout=SKILL_QUERY_TIMEOUT):
+    """Submits the tutorial lookups for every (deduplicated) skill now; returns {future: skill}."""
+    return {_resource_pool.submit(_skill_resources, skill, timeout): skill for skill in dedupe_skills(skills)}
+
+
+def iter_skill_resources(skills, timeout=SKILL_QUERY_TIMEOUT):
+    """
+    Yields (skill, markdown or None) as each lookup finishes. `skills` is a list of skills,
+    or lookups already started with start_skill_resources so they overlap other work.
+    Failed lookups yield None; lookups still running `timeout` seconds after draining
+    starts are abandoned and yield None.
+    """
+    futures = skills if isinstance(skills, dict) else start_skill_resources(skills, timeout)
+    pending = set(futures)
+    try:
+        for future in as_completed(futures, timeout=timeout):
+            pending.discard(future)
+            try:
+                yield futures[future], future.result() or None
+            except Exception as e:
+                print(f"DEBUG: Resource search for {futures[future]} failed ({str(e)}).")
+                yield futures[future], None
+    except TimeoutError:
+        for future in pending:
+            future.cancel()
+            yield futures[future], None
+
+
+def prefetch_company_info(company_name):
+    """Starts get_company_info in the background; a later call joins it or hits the cache."""
+    if not company_name or not company_name.strip():
+        return None
+    return _prefetch_pool.submit(get_company_info, company_name)
@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+
+from src.rate_limiter import RateLimiter
+
+
+class RateLimited(Exception):
+    status_code = 429
+
+
+class BadRequest(Exception):
+    status_code = 400
+
+
+def _limiter(max_retries=3):
+    limiter = RateLimiter(tokens_per_minute=10000, max_retries=max_retries, base_delay=0.0)
+    limiter.tokens.rate = 1e-9  # no refill during the test, so the level only moves by reservations
+    return limiter
+
+
+def _flaky(failures, error=RateLimited):
+    calls = {"count": 0}
+
+    def fn():
+        calls["count"] += 1
+        if calls["count"] <= failures:
+            raise error()
+        return "ok"
+    return fn, calls
+
+
+def test_retried_call_reserves_tokens_once():
+    limiter = _limiter()
+    fn, calls = _flaky(2)
+    assert limiter.call(fn, tokens=1000) == "ok"
+    assert calls["count"] == 3
+    assert limiter.tokens.level == pytest.approx(9000)
+    limiter.settle(1000, 100)
+    assert limiter.tokens.level == pytest.approx(9900)
+
+
+def test_final_failure_releases_reservation():
+    limiter = _limiter(max_retries=2)
+    fn, _ = _flaky(10)
+    with pytest.raises(RateLimited):
+        limiter.call(fn, tokens=1000)
+    assert limiter.tokens.level == pytest.approx(10000)
+
+    fn, calls = _flaky(1, BadRequest)
+    with pytest.raises(BadRequest):
+        limiter.call(fn, tokens=1000)
+    assert calls["count"] == 1
+    assert limiter.tokens.level == pytest.approx(10000)
+
+
+def test_retried_stream_reserves_tokens_once():
+    limiter = _limiter()
+    attempts = {"count": 0}
+
+    def open_stream():
+        attempts["count"] += 1
+        if attempts["count"] < 3:
+            raise RateLimited()
+        yield from "abc"
+
+    assert "".join(limiter.stream(open_stream, tokens=1000)) == "abc"
+    assert limiter.tokens.level == pytest.approx(9000)
+
+
+def test_retried_async_call_reserves_tokens_once():
+    limiter = _limiter()
+    fn, calls = _flaky(2)
+
+    async def afn():
+        return fn()
+
+    assert asyncio.run(limiter.acall(afn, tokens=1000)) == "ok"
+    assert calls["count"] == 3
+    assert limiter.tokens.level == pytest.approx(9000)
@@ -0,0 +1,40 @@
+from src import token_budget
+from src.chunker import _iter_units
+from src.token_budget import count_tokens, fit_to_budget
+
+
+def _words(n):
+    return " ".join(f"word{i}" for i in range(n))
+
+
+def test_word_windows_never_exceed_budget():
+    windows = list(_iter_units(_words(500), 100, count_tokens))
+    assert len(windows) > 1
+    assert all(count_tokens(w) <= 100 for w in windows)
+    assert " ".join(windows) == _words(500)
+
+
+def test_unpunctuated_section_is_truncated_not_dropped():
+    text = "EXPERIENCE " + _words(1300)
+    for budget in (200, 300, 1500):
+        fitted = fit_to_budget(text, budget)
+        assert fitted.startswith("EXPERIENCE word0 word1")
+        assert 0 < count_tokens(fitted) <= budget
+
+
+def test_sections_share_the_budget():
+    text = "SUMMARY Built things. Shipped things.\nSKILLS Python. SQL. Kafka. Docker."
+    fitted = fit_to_budget(text, 12)
+    assert "SUMMARY" in fitted and "SKILLS" in fitted
+    assert count_tokens(fitted) <= 12
+
+
+def test_env_budgets_reject_non_integer_limits(monkeypatch):
+    monkeypatch.setenv("CAREERFORGE_TOKEN_BUDGETS", '{"tailor_resume": {"resume": "4000"}}')
+    assert token_budget._env_budgets() == {}
+    monkeypatch.setenv("CAREERFORGE_TOKEN_BUDGETS", '{"tailor_resume": {"resume": 0}}')
+    assert token_budget._env_budgets() == {}
+    monkeypatch.setenv("CAREERFORGE_TOKEN_BUDGETS", "{bad")
+    assert token_budget._env_budgets() == {}
+    monkeypatch.setenv("CAREERFORGE_TOKEN_BUDGETS", '{"tailor_resume": {"resume": 4000}}')
+    assert token_budget._env_budgets() == {"tailor_resume": {"resume": 4000}}